@@ -1,45 +1,259 @@
 ## 🖥️ **Flask Server - app.py**
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+import hmac
+import json
+import time
+import threading
+from io import BytesIO
+from flask import Flask, Response, g, request, jsonify, send_file, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import pandas as pd
-from pathlib import Path
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import safe_join
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from config import (
+    BASE_DIR, DATA_DIR, PDF_DIR, STORAGE_BACKEND, SQLITE_PATH, JOURNAL_COMPACT_BYTES,
+    COMPRESS_MIN_BYTES, PDF_JOB_DIR, PDF_WORKERS, PDF_QUEUE_LIMIT,
+    PDF_CACHE_MAX_BYTES, EXPORT_WORKERS, EVENT_STREAM_LIMIT, FK_SUBTREE,
+    METRICS_DIR, METRICS_TOKEN, METRICS_PUBLIC, PROFILE_SAMPLE_RATE, PROFILE_KEEP, PROFILE_DIR,
+    REVIEW_YEAR, ARCHIVE_DIR, IMPORT_MAX_BYTES
+)
+from datastore import DataStore, ConflictError
+from token_index import TokenIndex
+from listing import ListQuery, ListingCache, build_listing, iter_joined, join_mitarbeiter, paginate, project
+from streaming import NDJSON_MIMETYPE, stream_json, stream_ndjson
+from http_cache import make_etag, not_modified, cache_headers, compress_response
+from pdf_jobs import PdfJobQueue, QueueFullError
+from pdf_cache import PdfCache
+from stats import StatsIndex, parse_group_by
+from employees import EmployeeIndex
+from search import SearchIndex, make_snippet, MAX_LIMIT as SEARCH_MAX_LIMIT
+from sync import (
+    EVENT_STREAM_SECONDS, EVENT_HEARTBEAT_SECONDS, ChangeNotifier,
+    format_event, parse_since, split_changes, sync_token
+)
+from bulk_export import BulkPdfExporter, ExportBusyError, pdf_entry_name, stream_zip
+from metrics import metrics, SlowRequestProfiler
+from archive import ArchiveSet, ArchiveReadOnlyError
+from excel import (
+    EXPORT_COLUMNS, STAMMDATEN_COLUMNS, STAMMDATEN_SHEET, MAX_ERRORS as IMPORT_MAX_ERRORS, WorkbookError,
+    write_workbook, iter_file, read_stammdaten, merge_stammdaten
+)
 
 app = Flask(__name__, static_folder='../app', static_url_path='')
 CORS(app)
 
-# Pfade (relativ zum Script)
-BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "data"
-PDF_DIR = DATA_DIR / "pdf_export"
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON-Serialisierung für jsonify, mit Zeitmessung"""
+
+    def dumps(self, obj, **kwargs):
+        with metrics.span('json'):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
+# Metriken aller Worker-Prozesse in einem gemeinsamen Ordner
+metrics.configure(METRICS_DIR)
+profiler = SlowRequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_KEEP) if PROFILE_SAMPLE_RATE > 0 else None
+
+@app.before_request
+def start_timing():
+    """Startzeit merken (und ggf. Anfrage für das Profiling auswählen)"""
+    g.request_started = time.perf_counter()
+    g.profiler = profiler.start() if profiler is not None else None
+
+# Als erstes registriert, läuft also nach allen anderen after_request (inkl. Kompression)
+@app.after_request
+def record_timing(response):
+    """Dauer pro Route erfassen (Route-Muster statt konkreter URL)"""
+    seconds = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unbekannt'
+    metrics.observe('mag_request_seconds', seconds,
+                    endpoint=endpoint, method=request.method, status=response.status_code)
+    if g.get('profiler') is not None:
+        profiler.stop(g.profiler, seconds, f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code}")
+    return response
+
 PDF_DIR.mkdir(exist_ok=True)
 
+# Gemeinsame Datenhaltung
+if STORAGE_BACKEND == 'sqlite':
+    from sqlite_store import SqliteStore, SqliteTokenIndex
+    store = SqliteStore(SQLITE_PATH)
+    tokens = SqliteTokenIndex(SQLITE_PATH)
+else:
+    # CSVs im Speicher, Änderungen über Journal
+    store = DataStore(DATA_DIR, journal_compact_bytes=JOURNAL_COMPACT_BYTES)
+    tokens = TokenIndex(DATA_DIR / 'tokens.csv')
+
+# Stammdaten als Index nach Personalnummer (pro Stand einmal gebaut)
+employees = EmployeeIndex(store)
+
+def fk_scope(user):
+    """Scope einer FK: eigene Gespräche, mit ?scope=subtree auch die aller Unterstellten"""
+    if FK_SUBTREE and request.args.get('scope') == 'subtree':
+        return ('subtree', user['personal_nr'])
+    return user['personal_nr']
+
+def scope_fks(scope):
+    """Führungskräfte im Scope: None (alle), eine Personalnummer oder eine Menge"""
+    if isinstance(scope, tuple):
+        return employees.org().subtree(scope[1])
+    return scope
+
+def has_access(user, gespraech):
+    """FK: eigene Gespräche und (falls erlaubt) die ihrer Unterstellten"""
+    if user['rolle'] != 'FK':
+        return True
+    if FK_SUBTREE:
+        return employees.org().contains(user['personal_nr'], gespraech['FK_PersonalNr'])
+    return gespraech['FK_PersonalNr'] == user['personal_nr']
+
+listing_cache = ListingCache()
+stats_index = StatsIndex(store, employees)
+search_index = SearchIndex(store)
+
+# Abgeschlossene Jahre: schreibgeschützte Archive, nur mit ?year= gelesen
+archives = ArchiveSet(ARCHIVE_DIR)
+archive_indexes = {}
+
+def year_source():
+    """Datenquelle für ?year=: Jahres-Archiv, falls vorhanden, sonst aktive Daten (laufendes Jahr).
+
+    ValueError bei ungültigem oder nicht archiviertem Jahr.
+    """
+    value = request.args.get('year', '').strip()
+    if not value:
+        return store
+    try:
+        year = int(value)
+    except ValueError:
+        raise ValueError('Parameter year muss eine Jahreszahl sein')
+    archive = archives.get(year)
+    if archive is None and year == REVIEW_YEAR:
+        return store
+    if archive is None:
+        raise ValueError(f'Keine Gespräche für {year} (laufendes Jahr: {REVIEW_YEAR}, '
+                         f'archiviert: {", ".join(map(str, archives.years())) or "keine"})')
+    return archive
+
+def source_version(source):
+    """Datenstand für Caches und ETags (Archive: plus aktuelle Stammdaten für die Namen)"""
+    if source is store:
+        return store.version
+    return (source.version, store.version)
+
+def indexes_for(source):
+    """(StatsIndex, SearchIndex) der aktiven Daten oder eines Archivs (bei Bedarf gebaut)"""
+    if source is store:
+        return stats_index, search_index
+    # Archive ändern sich nie: neu bauen nur bei neuem Archiv oder neuen Stammdaten
+    key = (source.version, store.stammdaten_version)
+    cached = archive_indexes.get(source.year)
+    if cached is None or cached[0] != key:
+        cached = archive_indexes[source.year] = (key, StatsIndex(source, employees), SearchIndex(source))
+    return cached[1], cached[2]
+
+def load_listing(scope, query, source=store):
+    """Mit Stammdaten ergänzen, filtern und sortieren (pro Datenstand gecacht)"""
+    return listing_cache.get(
+        (source_version(source), scope, query.cache_key()),
+        lambda: build_listing(
+            join_mitarbeiter(source.list_gespraeche(fk_personal_nr=scope_fks(scope)), employees),
+            query
+        )
+    )
+
+pdf_cache = PdfCache(PDF_DIR, PDF_CACHE_MAX_BYTES)
+
+def save_pdf_path(gespraechs_id, filename):
+    """PDF-Pfad beim Gespräch speichern (nur wenn er sich ändert)"""
+    path = str(PDF_DIR / filename)
+    gespraech = store.get_gespraech(gespraechs_id)
+    if gespraech is not None and gespraech.get('PDF_Pfad') != path:
+        store.update_gespraech(gespraechs_id, {'PDF_Pfad': path})
+
+# Felder, die über die API geändert werden dürfen
+UPDATEABLE_FIELDS = ['Datum', 'Status', 'Ziele_2025', 'Entwicklung', 'Feedback']
+
+# Höchstens so viele Gespräche pro PATCH
+MAX_BATCH_SIZE = 500
+
+# Alle Gespräche nach Änderungszeit (Grundlage für Delta-Sync)
+CHANGES_QUERY = ListQuery({'sort': 'Geaendert_am'})
+
+def load_changes(scope, query, since, source=store):
+    """Seit since geänderte Gespräche: (passende Zeilen, entfernte IDs)"""
+    rows, keys = load_listing(scope, CHANGES_QUERY, source)
+    return split_changes(rows, keys, since, query)
+
+change_notifier = ChangeNotifier(lambda: store.version)
+event_slots = threading.BoundedSemaphore(EVENT_STREAM_LIMIT)
+EVENT_TOKEN_COOKIE = 'mag_token'
+
+def event_stream(scope, since):
+    """Änderungen an sichtbaren Gesprächen als Server-Sent Events"""
+    # Browser verbindet sich nach Ende des Streams selbst neu
+    yield 'retry: 5000\n\n'
+    version = store.version
+    deadline = time.monotonic() + EVENT_STREAM_SECONDS
+    while time.monotonic() < deadline:
+        new_version = change_notifier.wait(version, timeout=EVENT_HEARTBEAT_SECONDS)
+        if new_version == version:
+            # Kommentarzeile hält die Verbindung offen
+            yield ': ping\n\n'
+            continue
+        version = new_version
+        next_since = sync_token()
+        changed, _ = load_changes(scope, CHANGES_QUERY, since)
+        since = next_since
+        if changed:
+            yield format_event('gespraeche', {
+                'ids': [row['Gespraechs_ID'] for row in changed],
+                'sync': since
+            })
+
+def store_pdf_path(job):
+    """Nach erfolgreichem Rendern den PDF-Pfad speichern und Cache begrenzen"""
+    # Archive bleiben unverändert
+    if not job.get('archived'):
+        save_pdf_path(job['gespraechs_id'], job['filename'])
+    pdf_cache.evict()
+
+pdf_jobs = PdfJobQueue(
+    PDF_JOB_DIR,
+    PDF_DIR,
+    max_workers=PDF_WORKERS,
+    max_pending=PDF_QUEUE_LIMIT,
+    on_done=store_pdf_path
+)
+
+bulk_exporter = BulkPdfExporter(max_workers=EXPORT_WORKERS)
+
+def job_response(job):
+    """Auftrag für die API aufbereiten"""
+    result = {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'gespraechs_id': job['gespraechs_id'],
+        'status_url': f"/api/jobs/{job['job_id']}"
+    }
+    if job['status'] == 'done':
+        result['filename'] = job['filename']
+        result['download_url'] = f"/api/pdf/{job['filename']}"
+    if job['status'] == 'failed':
+        result['error'] = job['error']
+    return result
+
+@app.after_request
+def compress(response):
+    """Grössere JSON-Antworten komprimieren"""
+    return compress_response(response, COMPRESS_MIN_BYTES)
+
 def validate_token(token):
     """Token validieren und User-Daten zurückgeben"""
     try:
-        df_tokens = pd.read_csv(DATA_DIR / 'tokens.csv', encoding='utf-8-sig')
-        user = df_tokens[df_tokens['Token'] == token]
-        
-        if user.empty:
-            return None
-        
-        # Gültigkeit prüfen
-        valid_until = pd.to_datetime(user.iloc[0]['Gueltig_bis'])
-        if valid_until < pd.Timestamp.now():
-            return None
-            
-        return {
-            'personal_nr': int(user.iloc[0]['PersonalNr']),
-            'rolle': user.iloc[0]['Rolle'],
-            'name': user.iloc[0]['Name'],
-            'email': user.iloc[0].get('Email', '')
-        }
+        return tokens.lookup(token)
     except Exception as e:
         print(f"❌ Token-Validierung fehlgeschlagen: {e}")
         return None
@@ -62,7 +276,8 @@ def login():
         user = validate_token(token)
         
         if user:
-            return jsonify({'success': True, 'user': user})
+            # subtree: Dashboard bietet den Filter nur an, wenn scope=subtree erlaubt ist
+            return jsonify({'success': True, 'user': {**user, 'subtree': user['rolle'] == 'FK' and FK_SUBTREE}})
         else:
             return jsonify({'success': False, 'error': 'Ungültiger oder abgelaufener Token'}), 401
             
@@ -82,33 +297,76 @@ def get_gespraeche():
         if not user:
             return jsonify({'error': 'Ungültiger Token'}), 401
         
-        # Daten laden
-        df_gespraeche = pd.read_csv(DATA_DIR / 'gespraeche.csv', encoding='utf-8-sig')
-        df_stammdaten = pd.read_csv(DATA_DIR / 'stammdaten.csv', encoding='utf-8-sig')
-        
         # Filtern nach Berechtigung
         if user['rolle'] == 'HR':
-            result = df_gespraeche
+            scope = None
         elif user['rolle'] == 'FK':
-            result = df_gespraeche[df_gespraeche['FK_PersonalNr'] == user['personal_nr']]
+            scope = fk_scope(user)
         else:
             return jsonify({'error': 'Keine Berechtigung'}), 403
         
-        # Mit Stammdaten mergen
-        result = result.merge(
-            df_stammdaten[['PersonalNr', 'Nachname', 'Vorname', 'Abteilung']],
-            left_on='MA_PersonalNr',
-            right_on='PersonalNr',
-            how='left'
-        )
-        
-        # NaN zu leeren Strings
-        result = result.fillna('')
-        
-        return jsonify({
+        try:
+            query = ListQuery(request.args)
+            since = parse_since(request.args['since']) if request.args.get('since') else None
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Startpunkt für den nächsten Delta-Sync (vor dem Lesen der Daten)
+        sync = sync_token()
+        
+        # Streaming: NDJSON per Accept-Header oder JSON mit ?stream=1
+        ndjson = NDJSON_MIMETYPE in request.headers.get('Accept', '')
+        streaming = ndjson or request.args.get('stream') == '1'
+        
+        # Unveränderte Daten nicht erneut senden
+        etag = make_etag(source_version(source), scope, request.query_string.decode('utf-8', 'replace'), ndjson)
+        if not_modified(etag):
+            return cache_headers(Response(status=304), etag)
+        
+        if since is not None:
+            # Delta-Sync: nur seit since geänderte Gespräche
+            changed, removed = load_changes(scope, query, since, source)
+            return cache_headers(jsonify({
+                'success': True,
+                'gespraeche': [project(row, query.fields) for row in changed],
+                'removed': removed,
+                'total': len(changed),
+                'sync': sync
+            }), etag)
+        
+        if streaming and query.is_unfiltered():
+            # Ohne Filter/Sortierung Zeile für Zeile ergänzen, nichts zwischenspeichern
+            rows = source.list_gespraeche(fk_personal_nr=scope_fks(scope))
+            total, next_cursor = len(rows), None
+            page = iter_joined(rows, employees)
+        else:
+            rows, keys = load_listing(scope, query, source)
+            total = len(rows)
+            page, next_cursor = paginate(rows, keys, query)
+        
+        if streaming:
+            page = (project(row, query.fields) for row in page)
+            if ndjson:
+                response = Response(stream_with_context(stream_ndjson(page)), mimetype=NDJSON_MIMETYPE)
+                response.headers['X-Total-Count'] = str(total)
+                response.headers['X-Sync'] = sync
+                if next_cursor:
+                    response.headers['X-Next-Cursor'] = next_cursor
+                return cache_headers(response, etag)
+            meta = {'success': True, 'total': total, 'next_cursor': next_cursor, 'sync': sync}
+            return cache_headers(Response(
+                stream_with_context(stream_json(page, 'gespraeche', meta)),
+                mimetype='application/json'
+            ), etag)
+        
+        return cache_headers(jsonify({
             'success': True,
-            'gespraeche': result.to_dict('records')
-        })
+            'gespraeche': [project(row, query.fields) for row in page],
+            'total': total,
+            'next_cursor': next_cursor,
+            'sync': sync
+        }), etag)
         
     except Exception as e:
         print(f"❌ Fehler beim Laden: {e}")
@@ -116,6 +374,100 @@ def get_gespraeche():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/events', methods=['GET'])
+def get_events():
+    """Server-Sent Events bei Änderungen an sichtbaren Gesprächen"""
+    try:
+        # EventSource kann keine Header setzen: Token als Cookie (nur für /api/events), nicht in der URL
+        token = request.headers.get('Authorization') or request.cookies.get(EVENT_TOKEN_COOKIE)
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        if user['rolle'] == 'HR':
+            scope = None
+        elif user['rolle'] == 'FK':
+            scope = fk_scope(user)
+        else:
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        # Jeder Stream belegt einen Thread
+        if not event_slots.acquire(blocking=False):
+            return jsonify({'error': 'Zu viele offene Verbindungen, bitte später erneut versuchen'}), 503
+        
+        response = Response(stream_with_context(event_stream(scope, sync_token())), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.call_on_close(event_slots.release)
+        return response
+        
+    except Exception as e:
+        print(f"❌ Event-Fehler: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search_gespraeche():
+    """Volltextsuche in Ziele, Entwicklung und Feedback"""
+    try:
+        token = request.headers.get('Authorization')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        # Gleiche Sichtbarkeit wie die Gesprächsliste
+        if user['rolle'] == 'HR':
+            scope = None
+        elif user['rolle'] == 'FK':
+            scope = fk_scope(user)
+        else:
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': 'Parameter q fehlt'}), 400
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({'error': 'Parameter limit muss eine Zahl sein'}), 400
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            return jsonify({'error': f'Parameter limit muss zwischen 1 und {SEARCH_MAX_LIMIT} liegen'}), 400
+        try:
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        etag = make_etag(source_version(source), scope, q, limit)
+        if not_modified(etag):
+            return cache_headers(Response(status=304), etag)
+        
+        _, index = indexes_for(source)
+        total, ranked, terms = index.search(q, fk_personal_nr=scope_fks(scope), limit=limit)
+        
+        by_nr = employees.current()
+        hits = []
+        for gespraechs_id, score in ranked:
+            gespraech = source.get_gespraech(gespraechs_id)
+            if gespraech is None:
+                continue
+            field, snippet = make_snippet(gespraech, terms)
+            ma = by_nr.get(gespraech['MA_PersonalNr'])
+            hits.append({
+                'Gespraechs_ID': gespraechs_id,
+                'MA_PersonalNr': gespraech['MA_PersonalNr'],
+                'Vorname': ma.vorname if ma else '',
+                'Nachname': ma.nachname if ma else '',
+                'Status': gespraech['Status'],
+                'score': round(score, 4),
+                'field': field,
+                'snippet': snippet
+            })
+        
+        return cache_headers(jsonify({'success': True, 'total': total, 'hits': hits}), etag)
+        
+    except Exception as e:
+        print(f"❌ Suchfehler: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/gespraeche/<int:gespraechs_id>', methods=['GET'])
 def get_gespraech(gespraechs_id):
     """Einzelnes Gespräch laden"""
@@ -125,39 +477,56 @@ def get_gespraech(gespraechs_id):
         if not user:
             return jsonify({'error': 'Ungültiger Token'}), 401
         
-        df_gespraeche = pd.read_csv(DATA_DIR / 'gespraeche.csv', encoding='utf-8-sig')
-        df_stammdaten = pd.read_csv(DATA_DIR / 'stammdaten.csv', encoding='utf-8-sig')
+        try:
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        gespraech = df_gespraeche[df_gespraeche['Gespraechs_ID'] == gespraechs_id]
+        gespraech_dict = source.get_gespraech(gespraechs_id)
         
-        if gespraech.empty:
+        if gespraech_dict is None:
             return jsonify({'error': 'Gespräch nicht gefunden'}), 404
         
-        gespraech = gespraech.iloc[0]
-        
         # Berechtigung prüfen
-        if user['rolle'] == 'FK' and gespraech['FK_PersonalNr'] != user['personal_nr']:
+        if not has_access(user, gespraech_dict):
             return jsonify({'error': 'Keine Berechtigung'}), 403
         
         # Mitarbeiter-Daten hinzufügen
-        ma = df_stammdaten[df_stammdaten['PersonalNr'] == gespraech['MA_PersonalNr']]
-        if not ma.empty:
-            ma = ma.iloc[0]
-            gespraech_dict = gespraech.to_dict()
-            gespraech_dict['MA_Name'] = f"{ma['Vorname']} {ma['Nachname']}"
-            gespraech_dict['MA_Abteilung'] = ma['Abteilung']
-        else:
-            gespraech_dict = gespraech.to_dict()
+        ma = employees.get(gespraech_dict['MA_PersonalNr'])
+        if ma is not None:
+            gespraech_dict['MA_Name'] = ma.name
+            gespraech_dict['MA_Abteilung'] = ma.abteilung
         
-        # NaN zu leeren Strings
-        gespraech_dict = {k: ('' if pd.isna(v) else v) for k, v in gespraech_dict.items()}
+        # ETag aus dem Inhalt (ändert sich mit Geaendert_am, PDF_Pfad, Stammdaten)
+        # Jahr des Gesprächs für Beschriftungen (z.B. „Ziele 2025“)
+        year = REVIEW_YEAR if source is store else source.year
+        etag = make_etag(json.dumps(gespraech_dict, sort_keys=True, default=str), year)
+        if not_modified(etag):
+            return cache_headers(Response(status=304), etag)
         
-        return jsonify({'success': True, 'gespraech': gespraech_dict})
+        return cache_headers(jsonify({'success': True, 'gespraech': gespraech_dict, 'year': year}), etag)
         
     except Exception as e:
         print(f"❌ Fehler: {e}")
         return jsonify({'error': str(e)}), 500
 
+def prepare_update(row, data):
+    """Erlaubte Felder übernehmen und Zeitstempel setzen, gibt (fields, expected) zurück"""
+    fields = {field: data[field] for field in UPDATEABLE_FIELDS if field in data}
+    now = datetime.now()
+    # Mit Millisekunden: zwei Speicherungen in derselben Sekunde bleiben für die 409-Prüfung unterscheidbar
+    fields['Geaendert_am'] = now.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    
+    # Abschlussdatum für die Statistik festhalten
+    if 'Status' in fields and fields['Status'] != row['Status']:
+        fields['Abgeschlossen_am'] = now.strftime('%Y-%m-%d %H:%M:%S') if fields['Status'] == 'Abgeschlossen' else ''
+    
+    # Optimistische Sperre: Client schickt den zuletzt geladenen Stand mit
+    expected = None
+    if data.get('Geaendert_am'):
+        expected = {'Geaendert_am': data['Geaendert_am']}
+    return fields, expected
+
 @app.route('/api/gespraeche/<int:gespraechs_id>', methods=['PUT'])
 def update_gespraech(gespraechs_id):
     """Gespräch aktualisieren"""
@@ -167,35 +536,118 @@ def update_gespraech(gespraechs_id):
         if not user:
             return jsonify({'error': 'Ungültiger Token'}), 401
         
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Erwartet wird ein JSON-Objekt mit den Feldern'}), 400
         
-        # CSV laden
-        df = pd.read_csv(DATA_DIR / 'gespraeche.csv', encoding='utf-8-sig')
+        try:
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Berechtigung prüfen
-        row = df[df['Gespraechs_ID'] == gespraechs_id]
-        if row.empty:
+        row = source.get_gespraech(gespraechs_id)
+        if row is None:
             return jsonify({'error': 'Gespräch nicht gefunden'}), 404
         
-        if user['rolle'] == 'FK':
-            if row.iloc[0]['FK_PersonalNr'] != user['personal_nr']:
-                return jsonify({'error': 'Keine Berechtigung'}), 403
+        if not has_access(user, row):
+            return jsonify({'error': 'Keine Berechtigung'}), 403
         
         # Daten aktualisieren
-        updateable_fields = ['Datum', 'Status', 'Ziele_2025', 'Entwicklung', 'Feedback']
+        fields, expected = prepare_update(row, data)
         
-        for field in updateable_fields:
-            if field in data:
-                df.loc[df['Gespraechs_ID'] == gespraechs_id, field] = data[field]
+        # Speichern
+        try:
+            updated = source.update_gespraech(gespraechs_id, fields, expected)
+        except ConflictError as e:
+            return jsonify({
+                'error': 'Gespräch wurde inzwischen von jemand anderem geändert',
+                'gespraech': e.current
+            }), 409
+        except ArchiveReadOnlyError as e:
+            return jsonify({'error': str(e)}), 403
+        
+        if updated is None:
+            return jsonify({'error': 'Gespräch nicht gefunden'}), 404
+        
+        print(f"✅ Gespräch {gespraechs_id} aktualisiert von {user['name']}")
         
-        df.loc[df['Gespraechs_ID'] == gespraechs_id, 'Geaendert_am'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return jsonify({
+            'success': True,
+            'message': 'Gespeichert',
+            'geaendert_am': updated['Geaendert_am']
+        })
+        
+    except Exception as e:
+        print(f"❌ Fehler beim Speichern: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/gespraeche', methods=['PATCH'])
+def update_gespraeche():
+    """Mehrere Gespräche auf einmal aktualisieren (ein Schreibvorgang)"""
+    try:
+        token = request.headers.get('Authorization')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        items = request.json
+        if not isinstance(items, list):
+            return jsonify({'error': 'Erwartet wird eine Liste von {Gespraechs_ID, fields}'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Höchstens {MAX_BATCH_SIZE} Gespräche pro Anfrage'}), 400
+        try:
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if source is not store:
+            return jsonify({'error': f'Gespräche aus {source.year} sind archiviert und können nicht geändert werden'}), 403
+        
+        # Pro Eintrag wie beim PUT prüfen, nur gültige Änderungen speichern
+        results = [None] * len(items)
+        updates, positions = [], []
+        for i, item in enumerate(items):
+            try:
+                gespraechs_id = int(item['Gespraechs_ID'])
+                data = dict(item['fields'])
+            except (KeyError, TypeError, ValueError):
+                results[i] = {'Gespraechs_ID': item.get('Gespraechs_ID') if isinstance(item, dict) else None,
+                              'status': 400, 'error': 'Gespraechs_ID und fields erforderlich'}
+                continue
+            
+            row = store.get_gespraech(gespraechs_id)
+            if row is None:
+                results[i] = {'Gespraechs_ID': gespraechs_id, 'status': 404, 'error': 'Gespräch nicht gefunden'}
+                continue
+            if not has_access(user, row):
+                results[i] = {'Gespraechs_ID': gespraechs_id, 'status': 403, 'error': 'Keine Berechtigung'}
+                continue
+            
+            if item.get('Geaendert_am'):
+                data['Geaendert_am'] = item['Geaendert_am']
+            fields, expected = prepare_update(row, data)
+            updates.append((gespraechs_id, fields, expected))
+            positions.append(i)
         
         # Speichern
-        df.to_csv(DATA_DIR / 'gespraeche.csv', index=False, encoding='utf-8-sig')
+        stored = store.update_gespraeche(updates) if updates else []
         
-        print(f"✅ Gespräch {gespraechs_id} aktualisiert von {user['name']}")
+        for i, (gespraechs_id, _, _), (status, current) in zip(positions, updates, stored):
+            if status == 'ok':
+                results[i] = {'Gespraechs_ID': gespraechs_id, 'status': 200, 'geaendert_am': current['Geaendert_am']}
+            elif status == 'conflict':
+                results[i] = {'Gespraechs_ID': gespraechs_id, 'status': 409,
+                              'error': 'Gespräch wurde inzwischen von jemand anderem geändert',
+                              'gespraech': current}
+            else:
+                results[i] = {'Gespraechs_ID': gespraechs_id, 'status': 404, 'error': 'Gespräch nicht gefunden'}
         
-        return jsonify({'success': True, 'message': 'Gespeichert'})
+        updated = sum(1 for result in results if result['status'] == 200)
+        print(f"✅ {updated} von {len(items)} Gesprächen aktualisiert von {user['name']}")
+        
+        return jsonify({'success': True, 'updated': updated, 'results': results})
         
     except Exception as e:
         print(f"❌ Fehler beim Speichern: {e}")
@@ -212,185 +664,46 @@ def generate_pdf(gespraechs_id):
         if not user:
             return jsonify({'error': 'Ungültiger Token'}), 401
         
-        # Daten laden
-        df_gespraeche = pd.read_csv(DATA_DIR / 'gespraeche.csv', encoding='utf-8-sig')
-        df_stammdaten = pd.read_csv(DATA_DIR / 'stammdaten.csv', encoding='utf-8-sig')
+        try:
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        year = REVIEW_YEAR if source is store else source.year
         
-        gespraech = df_gespraeche[df_gespraeche['Gespraechs_ID'] == gespraechs_id]
-        if gespraech.empty:
+        # Daten laden
+        gespraech = source.get_gespraech(gespraechs_id)
+        if gespraech is None:
             return jsonify({'error': 'Gespräch nicht gefunden'}), 404
         
-        gespraech = gespraech.iloc[0]
-        
         # Berechtigung prüfen
-        if user['rolle'] == 'FK' and gespraech['FK_PersonalNr'] != user['personal_nr']:
+        if not has_access(user, gespraech):
             return jsonify({'error': 'Keine Berechtigung'}), 403
         
-        # MA und FK Daten
-        ma = df_stammdaten[df_stammdaten['PersonalNr'] == gespraech['MA_PersonalNr']].iloc[0]
-        fk = df_stammdaten[df_stammdaten['PersonalNr'] == gespraech['FK_PersonalNr']].iloc[0]
-        
-        # PDF erstellen
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"MAG_{int(gespraech['MA_PersonalNr'])}_{timestamp}.pdf"
-        filepath = PDF_DIR / filename
-        
-        c = canvas.Canvas(str(filepath), pagesize=A4)
-        width, height = A4
-        
-        # Kanton ZH Blau: RGB(0, 158, 224)
-        zh_blue = (0/255, 158/255, 224/255)
-        zh_dark_blue = (0/255, 118/255, 189/255)
-        
-        # Header (blaue Box)
-        c.setFillColorRGB(*zh_blue)
-        c.rect(0, height - 3*cm, width, 3*cm, fill=True, stroke=False)
-        
-        c.setFillColorRGB(1, 1, 1)  # Weiss
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(2*cm, height - 2*cm, "Mitarbeitergespräch 2025")
-        
-        c.setFontSize(10)
-        c.drawString(2*cm, height - 2.6*cm, "Kanton Zürich")
-        
-        # Content
-        c.setFillColorRGB(0, 0, 0)  # Schwarz
-        y = height - 5*cm
-        
-        # Mitarbeitende
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, y, "Mitarbeitende:")
-        c.setFont("Helvetica", 11)
-        y -= 0.6*cm
-        c.drawString(2*cm, y, f"{ma['Vorname']} {ma['Nachname']}")
-        y -= 0.5*cm
-        c.drawString(2*cm, y, f"Personalnummer: {int(ma['PersonalNr'])}")
-        y -= 0.5*cm
-        c.drawString(2*cm, y, f"Abteilung: {ma['Abteilung']}")
-        
-        # Führungskraft
-        y -= 1.5*cm
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, y, "Führungskraft:")
-        c.setFont("Helvetica", 11)
-        y -= 0.6*cm
-        c.drawString(2*cm, y, f"{fk['Vorname']} {fk['Nachname']}")
-        
-        # Datum
-        y -= 1.5*cm
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, y, "Datum:")
-        c.setFont("Helvetica", 11)
-        y -= 0.6*cm
-        datum_str = str(gespraech.get('Datum', ''))
-        c.drawString(2*cm, y, datum_str if datum_str else 'Noch nicht festgelegt')
-        
-        # Ziele 2025
-        y -= 1.5*cm
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, y, "Ziele 2025:")
-        c.setFont("Helvetica", 10)
-        y -= 0.6*cm
-        
-        ziele = str(gespraech.get('Ziele_2025', ''))
-        if not ziele or ziele == 'nan':
-            ziele = 'Noch keine Ziele erfasst'
-        
-        # Text umbrechen
-        max_width = width - 4*cm
-        for line in ziele.split('\n')[:20]:
-            if y < 8*cm:
-                c.showPage()
-                y = height - 3*cm
-            # Lange Zeilen umbrechen
-            words = line.split()
-            current_line = ""
-            for word in words:
-                test_line = current_line + " " + word if current_line else word
-                if c.stringWidth(test_line, "Helvetica", 10) < max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        c.drawString(2.5*cm, y, current_line)
-                        y -= 0.5*cm
-                    current_line = word
-            if current_line:
-                c.drawString(2.5*cm, y, current_line)
-                y -= 0.5*cm
-        
-        # Entwicklung
-        if y < 12*cm:
-            c.showPage()
-            y = height - 3*cm
-        
-        y -= 1*cm
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, y, "Entwicklungsfelder:")
-        c.setFont("Helvetica", 10)
-        y -= 0.6*cm
-        
-        entwicklung = str(gespraech.get('Entwicklung', ''))
-        if not entwicklung or entwicklung == 'nan':
-            entwicklung = 'Keine Angaben'
-        
-        for line in entwicklung.split('\n')[:15]:
-            if y < 8*cm:
-                c.showPage()
-                y = height - 3*cm
-            words = line.split()
-            current_line = ""
-            for word in words:
-                test_line = current_line + " " + word if current_line else word
-                if c.stringWidth(test_line, "Helvetica", 10) < max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        c.drawString(2.5*cm, y, current_line)
-                        y -= 0.5*cm
-                    current_line = word
-            if current_line:
-                c.drawString(2.5*cm, y, current_line)
-                y -= 0.5*cm
-        
-        # Unterschriften (neue Seite)
-        c.showPage()
-        y = 8*cm
-        
-        c.setFont("Helvetica", 10)
-        c.line(2*cm, y, 8*cm, y)
-        c.line(12*cm, y, 18*cm, y)
-        
-        y -= 0.6*cm
-        c.drawString(2*cm, y, f"{ma['Vorname']} {ma['Nachname']}")
-        c.drawString(12*cm, y, f"{fk['Vorname']} {fk['Nachname']}")
-        
-        y -= 0.4*cm
-        c.setFontSize(9)
-        c.setFillColorRGB(0.4, 0.4, 0.4)
-        c.drawString(2*cm, y, "Mitarbeitende")
-        c.drawString(12*cm, y, "Führungskraft")
-        
-        # Footer
-        y = 2*cm
-        c.setFontSize(8)
-        c.drawString(2*cm, y, f"Erstellt am: {datetime.now().strftime('%d.%m.%Y um %H:%M Uhr')}")
-        
-        c.save()
-        
-        # Pfad in CSV speichern
-        df_gespraeche.loc[
-            df_gespraeche['Gespraechs_ID'] == gespraechs_id,
-            'PDF_Pfad'
-        ] = str(filepath)
-        df_gespraeche.to_csv(DATA_DIR / 'gespraeche.csv', index=False, encoding='utf-8-sig')
-        
-        print(f"✅ PDF generiert: {filename}")
-        
-        return jsonify({
-            'success': True,
-            'filename': filename,
-            'download_url': f'/api/pdf/{filename}'
-        })
+        # MA und FK Daten (None, falls nicht in den Stammdaten)
+        ma = employees.get_dict(gespraech['MA_PersonalNr'])
+        fk = employees.get_dict(gespraech['FK_PersonalNr'])
+        
+        # Dateiname aus dem Hash der Inhalte: unverändertes Gespräch -> vorhandenes PDF
+        filename = pdf_cache.filename(gespraech, ma, fk, year)
+        if pdf_cache.lookup(filename) is not None:
+            if source is store:
+                save_pdf_path(gespraechs_id, filename)
+            return jsonify({
+                'success': True,
+                'status': 'done',
+                'gespraechs_id': gespraechs_id,
+                'filename': filename,
+                'download_url': f"/api/pdf/{filename}",
+                'cached': True
+            })
+        
+        # PDF-Auftrag einreihen (wird im Prozess-Pool erstellt)
+        try:
+            job = pdf_jobs.submit(gespraech, ma, fk, year, filename, owner=user['personal_nr'], archived=source is not store)
+        except QueueFullError as e:
+            return jsonify({'error': str(e)}), 503
+        
+        return jsonify({'success': True, **job_response(job)}), 202
         
     except Exception as e:
         print(f"❌ PDF-Fehler: {e}")
@@ -398,15 +711,247 @@ def generate_pdf(gespraechs_id):
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status eines PDF-Auftrags"""
+    try:
+        token = request.headers.get('Authorization')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        job = pdf_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Auftrag nicht gefunden'}), 404
+        
+        # Gleiche Aufträge werden geteilt: auch andere FKs mit Zugriff dürfen abfragen
+        if user['rolle'] != 'HR' and job['owner'] != user['personal_nr']:
+            source = archives.get(job['year']) if job.get('archived') else store
+            gespraech = source.get_gespraech(job['gespraechs_id']) if source is not None else None
+            if gespraech is None or user['rolle'] != 'FK' or not has_access(user, gespraech):
+                return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        return jsonify({'success': True, **job_response(job)})
+        
+    except Exception as e:
+        print(f"❌ Fehler: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export/pdfs.zip', methods=['GET'])
+def export_pdfs():
+    """Alle sichtbaren Gespräche als ZIP mit PDFs (gestreamt)"""
+    try:
+        # Token auch als Query-Parameter, damit der Browser direkt herunterladen kann
+        token = request.headers.get('Authorization') or request.args.get('token')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        # Gleiche Berechtigungen und Filter wie die Gesprächsliste
+        if user['rolle'] == 'HR':
+            scope = None
+        elif user['rolle'] == 'FK':
+            scope = fk_scope(user)
+        else:
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        try:
+            query = ListQuery(request.args)
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rows, _ = load_listing(scope, query, source)
+        year = REVIEW_YEAR if source is store else source.year
+        
+        try:
+            bulk_exporter.acquire()
+        except ExportBusyError as e:
+            return jsonify({'error': str(e)}), 503
+        
+        # Platz wird beim Schliessen der Antwort frei, bei einem Fehler bis dahin sofort
+        try:
+            items = (
+                (
+                    pdf_entry_name(row),
+                    source.get_gespraech(row['Gespraechs_ID']),
+                    employees.get_dict(row['MA_PersonalNr']),
+                    employees.get_dict(row['FK_PersonalNr']),
+                    year
+                )
+                for row in rows
+            )
+            
+            print(f"📦 Sammel-Export von {user['name']}: {len(rows)} Gespräche")
+            
+            response = Response(
+                stream_with_context(stream_zip(bulk_exporter.render(items))),
+                mimetype='application/zip'
+            )
+            filename = f"MAG_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+            response.call_on_close(bulk_exporter.release)
+        except Exception:
+            bulk_exporter.release()
+            raise
+        return response
+        
+    except Exception as e:
+        print(f"❌ Export-Fehler: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export.xlsx', methods=['GET'])
+def export_xlsx():
+    """Sichtbare Gespräche mit Stammdaten als Excel (HR zusätzlich Blatt Stammdaten)"""
+    try:
+        # Token auch als Query-Parameter, damit der Browser direkt herunterladen kann
+        token = request.headers.get('Authorization') or request.args.get('token')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        
+        # Gleiche Berechtigungen und Filter wie die Gesprächsliste
+        if user['rolle'] == 'HR':
+            scope = None
+        elif user['rolle'] == 'FK':
+            scope = fk_scope(user)
+        else:
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        try:
+            query = ListQuery(request.args)
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if query.is_unfiltered():
+            # Ohne Filter Zeile für Zeile ergänzen, nichts zwischenspeichern
+            rows = iter_joined(source.list_gespraeche(fk_personal_nr=scope_fks(scope)), employees)
+        else:
+            rows, _ = load_listing(scope, query, source)
+        
+        by_nr = employees.current()
+        gespraeche = (
+            {**row, 'FK_Name': by_nr[row['FK_PersonalNr']].name if row['FK_PersonalNr'] in by_nr else ''}
+            for row in rows
+        )
+        sheets = [('Gespraeche', EXPORT_COLUMNS, gespraeche)]
+        if user['rolle'] == 'HR':
+            # Bearbeiten und über /api/import/stammdaten wieder einlesen
+            stammdaten = store.list_mitarbeiter()
+            columns = list(stammdaten[0]) if stammdaten else STAMMDATEN_COLUMNS
+            sheets.append((STAMMDATEN_SHEET, columns, stammdaten))
+        
+        f = write_workbook(sheets)
+        print(f"📊 Excel-Export von {user['name']}")
+        
+        response = Response(iter_file(f), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        filename = f"MAG_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.call_on_close(f.close)
+        return response
+        
+    except Exception as e:
+        print(f"❌ Excel-Export-Fehler: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/import/stammdaten', methods=['POST'])
+def import_stammdaten():
+    """Stammdaten aus Excel übernehmen (nur HR, ein Schreibvorgang)"""
+    try:
+        token = request.headers.get('Authorization')
+        user = validate_token(token)
+        if not user:
+            return jsonify({'error': 'Ungültiger Token'}), 401
+        if user['rolle'] != 'HR':
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        
+        # Grenze gilt auch ohne Content-Length (chunked): Werkzeug bricht beim Lesen ab
+        request.max_content_length = IMPORT_MAX_BYTES
+        too_large = jsonify({'error': f'Datei zu gross (max. {IMPORT_MAX_BYTES // (1024 * 1024)} MB)'}), 413
+        
+        # Datei als Formularfeld 'file' oder direkt als Body (blockweise, get_data kürzt stillschweigend)
+        try:
+            upload = request.files.get('file')
+            if upload is not None:
+                file = upload.stream
+            else:
+                file = BytesIO()
+                for chunk in iter(lambda: request.stream.read(64 * 1024), b''):
+                    file.write(chunk)
+                file.seek(0)
+        except RequestEntityTooLarge:
+            return too_large
+        
+        # ?replace=1: Personen, die nicht in der Datei stehen, entfernen
+        replace = request.args.get('replace') == '1'
+        dry_run = request.args.get('dry_run') == '1'
+        
+        try:
+            columns, records, errors = read_stammdaten(file)
+        except WorkbookError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if errors:
+            return jsonify({
+                'error': f'{len(errors)} ungültige Zeilen, nichts übernommen',
+                'errors': errors[:IMPORT_MAX_ERRORS]
+            }), 400
+        if not records:
+            return jsonify({'error': 'Keine Stammdaten in der Datei'}), 400
+        
+        result = {}
+        
+        def build(current, current_columns):
+            rows, new_columns, summary, warnings = merge_stammdaten(current, current_columns, columns, records, replace)
+            result.update(summary, warnings=warnings[:IMPORT_MAX_ERRORS])
+            if dry_run or not (summary['inserted'] or summary['updated'] or summary['removed']):
+                return None
+            return rows, new_columns
+        
+        # Lesen, Zusammenführen und Schreiben unter einem Schreib-Lock
+        store.replace_stammdaten(build)
+        
+        if not dry_run:
+            print(f"✅ Stammdaten importiert von {user['name']}: {result['inserted']} neu, "
+                  f"{result['updated']} geändert, {result['removed']} entfernt")
+        
+        return jsonify({'success': True, 'dry_run': dry_run, **result})
+        
+    except Exception as e:
+        print(f"❌ Import-Fehler: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/pdf/<filename>')
 def download_pdf(filename):
-    """PDF herunterladen"""
+    """PDF herunterladen (mit ETag, If-Modified-Since und Range-Anfragen)"""
     try:
-        filepath = PDF_DIR / filename
-        if not filepath.exists():
+        filepath = safe_join(str(PDF_DIR), filename)
+        if filepath is None or not filename.endswith('.pdf'):
+            return jsonify({'error': 'PDF nicht gefunden'}), 404
+        
+        # Als genutzt markieren (für die Verdrängung im Cache)
+        filepath = pdf_cache.lookup(filename)
+        if filepath is None:
             return jsonify({'error': 'PDF nicht gefunden'}), 404
         
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        # Inhalt zu einem Dateinamen ändert sich nie (Hash im Namen)
+        response = send_file(
+            filepath,
+            as_attachment=True,
+            download_name=filename,
+            conditional=True,
+            etag=filepath.stem,
+            max_age=86400
+        )
+        response.headers['Cache-Control'] = 'private, max-age=86400, immutable'
+        return response
         
     except Exception as e:
         print(f"❌ Download-Fehler: {e}")
@@ -414,26 +959,67 @@ def download_pdf(filename):
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Statistiken für HR"""
+    """Statistiken (HR: alle Gespräche, FK: nur die in der Liste sichtbaren, für die Zähler im Dashboard)"""
     try:
         token = request.headers.get('Authorization')
         user = validate_token(token)
         
-        if not user or user['rolle'] != 'HR':
+        if not user or user['rolle'] not in ('HR', 'FK'):
             return jsonify({'error': 'Keine Berechtigung'}), 403
         
-        df_gespraeche = pd.read_csv(DATA_DIR / 'gespraeche.csv', encoding='utf-8-sig')
+        scope = None if user['rolle'] == 'HR' else fk_scope(user)
+        
+        try:
+            group_by = parse_group_by(request.args.get('group_by'))
+            source = year_source()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        etag = make_etag(source_version(source), scope, ','.join(group_by))
+        if not_modified(etag):
+            return cache_headers(Response(status=304), etag)
+        
+        # Laufend nachgeführte Zähler statt alle Gespräche zu zählen
+        index, _ = indexes_for(source)
+        stats = index.summary(fk_personal_nr=scope_fks(scope), group_by=group_by)
+        
+        return cache_headers(jsonify({'success': True, 'stats': stats}), etag)
         
-        stats = {
-            'total': len(df_gespraeche),
-            'geplant': len(df_gespraeche[df_gespraeche['Status'] == 'Geplant']),
-            'in_bearbeitung': len(df_gespraeche[df_gespraeche['Status'] == 'In Bearbeitung']),
-            'abgeschlossen': len(df_gespraeche[df_gespraeche['Status'] == 'Abgeschlossen'])
-        }
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/years', methods=['GET'])
+def get_years():
+    """Laufendes Jahr und archivierte Jahre (für ?year=)"""
+    try:
+        token = request.headers.get('Authorization')
+        if not validate_token(token):
+            # Laufendes Jahr auch ohne Token (Titel der Login-Seite), Archive nur angemeldet
+            return jsonify({'success': True, 'current': REVIEW_YEAR})
+        
+        return jsonify({'success': True, 'current': REVIEW_YEAR, 'archived': archives.years()})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Latenz-Histogramme aller Worker-Prozesse im Prometheus-Textformat"""
+    try:
+        # Scraper mit MAG_METRICS_TOKEN oder HR-Token, anonym nur mit MAG_METRICS_PUBLIC=1
+        token = request.headers.get('Authorization', '')
+        scraper = METRICS_TOKEN and hmac.compare_digest(token.encode(), f"Bearer {METRICS_TOKEN}".encode())
+        if not (METRICS_PUBLIC or scraper):
+            user = validate_token(token)
+            if not user:
+                return jsonify({'error': 'Ungültiger Token'}), 401
+            if user['rolle'] != 'HR':
+                return jsonify({'error': 'Keine Berechtigung'}), 403
         
-        return jsonify({'success': True, 'stats': stats})
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
         
     except Exception as e:
+        print(f"❌ Metriken-Fehler: {e}")
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
@@ -442,7 +1028,11 @@ if __name__ == '__main__':
     print("=" * 70)
     print(f"📁 Basis-Verzeichnis: {BASE_DIR.absolute()}")
     print(f"📊 Daten: {DATA_DIR.absolute()}")
+    print(f"🗃️  Speicher: {STORAGE_BACKEND}" + (f" ({SQLITE_PATH.absolute()})" if STORAGE_BACKEND == 'sqlite' else ''))
     print(f"📄 PDFs: {PDF_DIR.absolute()}")
+    print(f"🗄️  Laufendes Jahr: {REVIEW_YEAR}, Archiv: {', '.join(map(str, archives.years())) or 'leer'}")
+    if profiler is not None:
+        print(f"🔬 Profiling: {PROFILE_SAMPLE_RATE:.0%} der Anfragen, langsamste in {PROFILE_DIR.absolute()}")
     print(f"🌐 URL: http://10.96.134.42:5000")
     print(f"📅 Gestartet: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
     print("=" * 70)
@@ -0,0 +1,101 @@
+## 🗄️ **Archiv vergangener Jahre - archive.py**
+
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from sqlite_store import SqliteStore, create_table, insert_rows
+
+ARCHIVE_PATTERN = re.compile(r'^gespraeche_(\d{4})\.sqlite3$')
+
+
+class ArchiveReadOnlyError(Exception):
+    """Archivierte Gespräche können nicht geändert werden"""
+
+
+def archive_path(directory, year):
+    """Archiv-Datei eines Jahres: archiv/gespraeche_2025.sqlite3"""
+    return Path(directory) / f"gespraeche_{int(year)}.sqlite3"
+
+
+def write_archive(path, rows, columns):
+    """Gespräche als kompakte, indexierte SQLite-Datei speichern (atomar ersetzen)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(str(tmp_path), isolation_level=None)
+    try:
+        with conn:
+            conn.execute('BEGIN')
+            create_table(conn, 'gespraeche', columns)
+            insert_rows(conn, 'gespraeche', columns, rows)
+        # Kein Platz für spätere Änderungen nötig: Datei so klein wie möglich
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+class YearArchive(SqliteStore):
+    """Gespräche eines abgeschlossenen Jahres, nur lesend.
+
+    Gleiche Leseschnittstelle wie DataStore/SqliteStore (Listen, Einzelabruf,
+    changes_since), damit Listing, Statistik und Suche unverändert laufen.
+    Die Datei ändert sich nie; wird sie ersetzt, öffnet ArchiveSet sie neu.
+    Stammdaten enthält das Archiv nicht, Namen kommen immer aus den aktiven Daten.
+    """
+
+    def __init__(self, path, year, signature):
+        super().__init__(path)
+        self.year = year
+        self.signature = signature
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # immutable: keine Sperren nötig, die Datei wird nur atomar ersetzt
+            uri = f"{Path(self.path).resolve().as_uri()}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @property
+    def version(self):
+        """Datenstand: ändert sich nur, wenn das Archiv neu geschrieben wird"""
+        return f"archiv-{self.year}-{self.signature}"
+
+    def update_gespraeche(self, updates):
+        raise ArchiveReadOnlyError(f'Gespräche aus {self.year} sind archiviert und können nicht geändert werden')
+
+
+class ArchiveSet:
+    """Alle Jahres-Archive in einem Ordner, bei Bedarf geöffnet"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def years(self):
+        """Archivierte Jahre, neuestes zuerst"""
+        if not self.directory.is_dir():
+            return []
+        years = [int(m.group(1)) for m in map(ARCHIVE_PATTERN.match, os.listdir(self.directory)) if m]
+        return sorted(years, reverse=True)
+
+    def get(self, year):
+        """Archiv eines Jahres oder None, falls es keines gibt"""
+        path = archive_path(self.directory, year)
+        try:
+            signature = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            archive = self._open.get(year)
+            if archive is None or archive.signature != signature:
+                archive = self._open[year] = YearArchive(path, year, signature)
+            return archive
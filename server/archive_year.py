@@ -0,0 +1,73 @@
+## 🗄️ **Jahresabschluss - archive_year.py**
+
+import shutil
+import argparse
+from datetime import datetime
+from config import DATA_DIR, STORAGE_BACKEND, SQLITE_PATH, ARCHIVE_DIR, REVIEW_YEAR
+from archive import ArchiveSet, archive_path, write_archive
+
+
+def archive_year(year, force=False):
+    """Gespräche des laufenden Zyklus ins Jahres-Archiv verschieben (aktive Daten danach leer)"""
+
+    print("=" * 70)
+    print(f"🗄️  JAHRESABSCHLUSS {year}")
+    print("=" * 70)
+    print()
+
+    path = archive_path(ARCHIVE_DIR, year)
+    if path.exists() and not force:
+        print(f"❌ Archiv existiert bereits: {path}")
+        print("   Mit --force überschreiben (das bisherige Archiv wird als .bak gesichert).")
+        return False
+
+    if STORAGE_BACKEND == 'sqlite':
+        from sqlite_store import SqliteStore
+        store = SqliteStore(SQLITE_PATH)
+    else:
+        from datastore import DataStore
+        store = DataStore(DATA_DIR)
+
+    def write(rows, columns):
+        if not rows:
+            raise ValueError('Keine Gespräche im laufenden Zyklus')
+        if path.exists():
+            # Bisheriges Archiv ist die einzige Kopie dieses Jahres: vor dem Überschreiben sichern
+            backup = path.with_name(f"{path.name}.{datetime.now().strftime('%Y%m%d_%H%M%S')}.bak")
+            shutil.copy2(path, backup)
+            print(f"💾 Bisheriges Archiv gesichert: {backup.name}")
+        print(f"📥 {len(rows)} Gespräche gelesen, schreibe Archiv...")
+        write_archive(path, rows, columns)
+
+    # Lesen, Archiv schreiben und Leeren unter einem Schreib-Lock
+    try:
+        store.archive_gespraeche(write)
+    except ValueError as e:
+        print(f"❌ {e}, nichts archiviert")
+        return False
+
+    archive = ArchiveSet(ARCHIVE_DIR).get(year)
+    print(f"   ✓ {len(archive.list_gespraeche())} Gespräche in {path.name} "
+          f"({path.stat().st_size / 1024:.0f} KB)")
+    print("   ✓ Aktive Gesprächsdaten geleert")
+
+    print()
+    print("=" * 70)
+    print("✅ JAHR ARCHIVIERT")
+    print("=" * 70)
+    print()
+    print("💡 HINWEIS:")
+    print(f"   Server mit MAG_REVIEW_YEAR={year + 1} neu starten.")
+    print(f"   Archivierte Gespräche sind über ?year={year} weiterhin lesbar.")
+    print()
+    print(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Abgeschlossenen Gesprächszyklus schreibgeschützt archivieren")
+    parser.add_argument('year', type=int, nargs='?', default=REVIEW_YEAR,
+                        help=f"Jahr des abgeschlossenen Zyklus (Standard: MAG_REVIEW_YEAR = {REVIEW_YEAR})")
+    parser.add_argument('--force', action='store_true', help="Bestehendes Archiv überschreiben (vorher als .bak gesichert)")
+    args = parser.parse_args()
+    archive_year(args.year, args.force)
@@ -0,0 +1,402 @@
+## ⏱️ **Benchmark und Lasttest - benchmark.py**
+
+# Misst die API über den Flask-Test-Client gegen generierte Daten
+# wachsender Grösse (setup_data.generate_dataset), pro Grösse in einem
+# eigenen Prozess mit eigenem Datenordner (MAG_DATA_DIR):
+#
+#   python benchmark.py --sizes 1000 10000 50000 --output benchmark.json
+#   python benchmark.py --compare benchmark_alt.json --output benchmark.json
+#
+# Die echten Daten in data/ werden nicht angefasst.
+
+import os
+import io
+import csv
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: kein Peak-RSS
+    resource = None
+
+# Anteile der Operationen im gemischten Lasttest
+MIXED_WEIGHTS = {
+    'list_fk': 30,
+    'detail': 25,
+    'update': 15,
+    'login': 10,
+    'stats': 10,
+    'search': 10
+}
+
+FEEDBACK_TEXTE = ['Gute Zusammenarbeit im Team.', 'Ziele wurden erreicht.', 'Sehr engagiert.']
+
+
+def peak_rss_mb():
+    """Höchster Speicherverbrauch des Prozesses bisher (MB) oder None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: Bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(values, p):
+    """p-Perzentil einer sortierten Liste (linear interpoliert)"""
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+def summarize(latencies, errors, elapsed):
+    """Kennzahlen zu einer Messreihe (Latenzen in Sekunden)"""
+    ordered = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'first_ms': ms(latencies[0]) if latencies else None,
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': ms(percentile(ordered, 50)),
+        'p95_ms': ms(percentile(ordered, 95)),
+        'p99_ms': ms(percentile(ordered, 99)),
+        'max_ms': ms(ordered[-1]) if ordered else None,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        # ru_maxrss gilt für den ganzen Prozess: Höchststand bis Ende dieser Messreihe,
+        # nicht der Verbrauch des einzelnen Endpunkts
+        'process_peak_rss_mb': peak_rss_mb()
+    }
+
+
+class Scenario:
+    """Anfragen an die App, je Operation eine Methode (gibt die Response zurück)"""
+
+    def __init__(self, app_module, rng):
+        self.app = app_module
+        self.client = app_module.app.test_client()
+        self.rng = rng
+
+        self.fk_tokens, self.hr_token = load_tokens(app_module.DATA_DIR)
+        self.ids = [int(g['Gespraechs_ID']) for g in app_module.store.list_gespraeche()]
+
+    def _hr(self):
+        return {'Authorization': self.hr_token}
+
+    def login(self):
+        return self.client.post('/api/login', json={'token': self.rng.choice(self.fk_tokens)})
+
+    def list_fk(self):
+        return self.client.get('/api/gespraeche?limit=50',
+                               headers={'Authorization': self.rng.choice(self.fk_tokens)})
+
+    def list_fk_subtree(self):
+        return self.client.get('/api/gespraeche?limit=50&scope=subtree',
+                               headers={'Authorization': self.rng.choice(self.fk_tokens)})
+
+    def list_hr(self):
+        return self.client.get('/api/gespraeche?limit=50&sort=-Datum', headers=self._hr())
+
+    def detail(self):
+        return self.client.get(f'/api/gespraeche/{self.rng.choice(self.ids)}', headers=self._hr())
+
+    def update(self):
+        return self.client.put(f'/api/gespraeche/{self.rng.choice(self.ids)}', headers=self._hr(),
+                               json={'Feedback': self.rng.choice(FEEDBACK_TEXTE)})
+
+    def stats(self):
+        return self.client.get('/api/stats', headers=self._hr())
+
+    def stats_group(self):
+        return self.client.get('/api/stats?group_by=Abteilung,Monat', headers=self._hr())
+
+    def search(self):
+        return self.client.get('/api/search?q=Führung&limit=20', headers=self._hr())
+
+    def pdf(self):
+        # Auftrag einreihen und warten, bis das PDF fertig ist
+        response = self.client.post(f'/api/gespraeche/{self.rng.choice(self.ids)}/pdf', headers=self._hr())
+        if response.status_code != 202:
+            return response
+        status_url = response.get_json()['status_url']
+        while True:
+            response = self.client.get(status_url, headers=self._hr())
+            if response.status_code != 200 or response.get_json()['status'] in ('done', 'failed'):
+                return response
+            time.sleep(0.005)
+
+
+def load_tokens(data_dir):
+    """(FK-Tokens, HR-Token) aus tokens.csv"""
+    fk_tokens, hr_token = [], None
+    with open(Path(data_dir) / 'tokens.csv', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            if row['Rolle'] == 'HR':
+                hr_token = row['Token']
+            else:
+                fk_tokens.append(row['Token'])
+    return fk_tokens, hr_token
+
+
+def failed(response):
+    return response.status_code >= 400 or (
+        response.is_json and response.get_json().get('status') == 'failed')
+
+
+def measure(operation, iterations):
+    """Operation wiederholt ausführen und Kennzahlen berechnen"""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        response = operation()
+        latencies.append(time.perf_counter() - t0)
+        errors += failed(response)
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_mixed(app_module, threads, total_ops, seed):
+    """Gemischte Lese-/Schreiblast aus mehreren Threads gleichzeitig"""
+    names = list(MIXED_WEIGHTS)
+    weights = [MIXED_WEIGHTS[name] for name in names]
+    results = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        scenario = Scenario(app_module, random.Random(seed + index))
+        local = {name: [] for name in names}
+        local_errors = {name: 0 for name in names}
+        barrier.wait()
+        for _ in range(total_ops // threads):
+            name = scenario.rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            response = getattr(scenario, name)()
+            local[name].append(time.perf_counter() - t0)
+            local_errors[name] += failed(response)
+        with lock:
+            for name in names:
+                results[name].extend(local[name])
+                errors[name] += local_errors[name]
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [latency for name in names for latency in results[name]]
+    return {
+        'threads': threads,
+        'total': summarize(all_latencies, sum(errors.values()), elapsed),
+        'operations': {name: summarize(results[name], errors[name], elapsed)
+                       for name in names if results[name]}
+    }
+
+
+def run_worker(args):
+    """Läuft im Kindprozess: App importieren, Endpunkte und Mischlast messen"""
+    result = {'rss_before_import_mb': peak_rss_mb()}
+    # Ausgaben der App (✅ ... aktualisiert) würden die Messung verfälschen
+    with contextlib.redirect_stdout(io.StringIO() if not args.verbose else sys.stdout):
+        if os.environ.get('MAG_STORAGE') == 'sqlite':
+            from migrate_to_sqlite import migrate
+            migrate()
+
+        t0 = time.perf_counter()
+        import app as app_module
+        result['import_s'] = round(time.perf_counter() - t0, 3)
+        result['gespraeche'] = len(app_module.store.list_gespraeche())
+        result['rss_after_import_mb'] = peak_rss_mb()
+
+        scenario = Scenario(app_module, random.Random(args.seed))
+        iterations = {
+            'login': args.iterations,
+            'list_fk': args.iterations,
+            'list_fk_subtree': args.iterations,
+            'list_hr': args.iterations,
+            'detail': args.iterations,
+            'update': args.iterations,
+            'stats': args.iterations,
+            'stats_group': args.iterations,
+            'search': args.iterations,
+            'pdf': args.pdf_iterations
+        }
+        result['endpoints'] = {}
+        for name, count in iterations.items():
+            if count > 0:
+                result['endpoints'][name] = measure(getattr(scenario, name), count)
+
+        if args.threads > 0 and args.mixed_ops > 0:
+            result['mixed'] = run_mixed(app_module, args.threads, args.mixed_ops, args.seed)
+
+    with open(args.worker_output, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def cell(value, spec, width=10):
+    """Zahl formatieren, fehlende Werte (None) als '-'"""
+    return f"{'-' if value is None else format(value, spec):>{width}}"
+
+
+def print_result(result):
+    print(f"   {'Endpunkt':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+          f"{'Proz.-Peak':>12}{'Fehler':>8}")
+    rows = list(result['endpoints'].items())
+    if 'mixed' in result:
+        rows.append((f"gemischt ({result['mixed']['threads']} T)", result['mixed']['total']))
+    for name, m in rows:
+        print(f"   {name:<18}{cell(m['p50_ms'], '.2f')}{cell(m['p95_ms'], '.2f')}{cell(m['p99_ms'], '.2f')}"
+              f"{cell(m['throughput_rps'], '.1f')}{cell(m.get('process_peak_rss_mb'), '.1f', 12)}"
+              f"{m['errors']:>8}")
+    print("   (Proz.-Peak: höchster RSS des Benchmark-Prozesses in MB bis zu dieser Messreihe)")
+
+
+def compare(previous, current, threshold):
+    """p95 mit einem früheren Lauf vergleichen, gibt die Anzahl Verschlechterungen zurück"""
+    old = {(r['employees'], name): m['p95_ms']
+           for r in previous['results'] for name, m in r['endpoints'].items()}
+    regressions = 0
+    print()
+    if previous['meta'].get('storage') != current['meta']['storage']:
+        print(f"⚠️  Früherer Lauf mit anderem Speicher-Backend ({previous['meta'].get('storage')})")
+    print(f"📈 Vergleich p95 mit {previous['meta'].get('git_commit') or 'früherem Lauf'}:")
+    for result in current['results']:
+        for name, m in result['endpoints'].items():
+            before = old.get((result['employees'], name))
+            if not before or m['p95_ms'] is None:
+                continue
+            change = m['p95_ms'] / before - 1
+            worse = change > threshold
+            regressions += worse
+            print(f"   {'⚠️ ' if worse else '  '} {result['employees']:>8} {name:<18}"
+                  f"{before:>10.2f} -> {m['p95_ms']:>10.2f} ms ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API-Benchmark gegen generierte Testdaten")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help="Anzahl Mitarbeitende pro Lauf (Standard: 1000 10000 50000)")
+    parser.add_argument('--depth', type=int, default=6, help="Hierarchie-Ebenen der Testdaten")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=200, help="Anfragen pro Endpunkt")
+    parser.add_argument('--pdf-iterations', type=int, default=20, help="PDF-Aufträge pro Lauf")
+    parser.add_argument('--threads', type=int, default=8, help="Threads im gemischten Lasttest (0 = aus)")
+    parser.add_argument('--mixed-ops', type=int, default=2000, help="Anfragen im gemischten Lasttest")
+    parser.add_argument('--storage', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--output', default='benchmark_results.json', help="Ergebnisse als JSON")
+    parser.add_argument('--compare', help="Früheres Ergebnis (JSON) zum Vergleich")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Verschlechterung von p95 ab diesem Anteil melden (Standard 0.2)")
+    parser.add_argument('--keep', action='store_true', help="Generierte Datenordner behalten")
+    parser.add_argument('--verbose', action='store_true', help="Ausgaben der App anzeigen")
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_output:
+        run_worker(args)
+        return 0
+
+    from setup_data import generate_dataset
+
+    print("=" * 70)
+    print("⏱️  API-BENCHMARK")
+    print("=" * 70)
+    print()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'storage': args.storage,
+            'seed': args.seed,
+            'depth': args.depth,
+            'iterations': args.iterations,
+            'pdf_iterations': args.pdf_iterations,
+            'threads': args.threads,
+            'mixed_ops': args.mixed_ops
+        },
+        'results': []
+    }
+
+    for size in args.sizes:
+        data_dir = Path(tempfile.mkdtemp(prefix=f'mag_bench_{size}_'))
+        try:
+            print(f"📊 {size} Mitarbeitende ({data_dir})")
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_dataset(size, args.depth, args.seed, force=True, data_dir=data_dir)
+            print(f"   ✓ Testdaten in {time.perf_counter() - t0:.1f}s erzeugt")
+
+            # Eigener Prozess pro Grösse: frischer Speicher, eigene Konfiguration
+            # (Hierarchie eingeschaltet, damit list_fk_subtree den Teilbaum misst)
+            output = data_dir / 'benchmark_worker.json'
+            env = dict(os.environ, MAG_DATA_DIR=str(data_dir), MAG_STORAGE=args.storage,
+                       MAG_SQLITE_PATH=str(data_dir / 'mag.sqlite3'), MAG_FK_SUBTREE='1')
+            command = [sys.executable, str(Path(__file__).resolve()), '--worker-output', str(output),
+                       '--seed', str(args.seed), '--iterations', str(args.iterations),
+                       '--pdf-iterations', str(args.pdf_iterations), '--threads', str(args.threads),
+                       '--mixed-ops', str(args.mixed_ops)]
+            if args.verbose:
+                command.append('--verbose')
+            completed = subprocess.run(command, env=env, cwd=Path(__file__).parent)
+            if completed.returncode != 0 or not output.exists():
+                print(f"   ❌ Benchmark-Prozess fehlgeschlagen (Exit-Code {completed.returncode})")
+                continue
+
+            with open(output, encoding='utf-8') as f:
+                result = {'employees': size, **json.load(f)}
+            print(f"   ✓ {result['gespraeche']} Gespräche, App geladen in {result['import_s']}s")
+            print_result(result)
+            print()
+            report['results'].append(result)
+        finally:
+            if not args.keep:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Ergebnisse gespeichert: {Path(args.output).absolute()}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        print()
+        print(f"{'⚠️ ' if regressions else '✅'} {regressions} Verschlechterungen über {args.threshold:.0%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+## 🗜️ **Sammel-Export - bulk_export.py**
+
+import re
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pdf_render import render_pdf_bytes
+
+
+class ExportBusyError(Exception):
+    """Es laufen bereits zu viele Sammel-Exporte"""
+
+
+class _ZipBuffer:
+    """Nicht-seekbarer Schreibpuffer, der nach jeder Datei geleert wird"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """(Name, Bytes)-Paare als ZIP-Datenstrom erzeugen, ohne das Archiv zu puffern"""
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def pdf_entry_name(row):
+    """Dateiname im Archiv, z.B. MAG_12345_Müller_Anna_1.pdf"""
+    name = (f"MAG_{row['MA_PersonalNr']}_{row.get('Nachname', '')}_"
+            f"{row.get('Vorname', '')}_{row['Gespraechs_ID']}")
+    return re.sub(r'[^\w-]+', '_', name).strip('_') + '.pdf'
+
+
+class BulkPdfExporter:
+    """Viele PDFs parallel rendern und in Fertigstellungs-Reihenfolge liefern.
+
+    Pro Export wird ein eigener Prozess-Pool gestartet; höchstens
+    max_exports Exporte laufen gleichzeitig.
+    """
+
+    def __init__(self, max_workers, max_exports=1):
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_exports)
+
+    def acquire(self):
+        """Platz für einen Export reservieren, sonst ExportBusyError"""
+        if not self._slots.acquire(blocking=False):
+            raise ExportBusyError('Es läuft bereits ein Sammel-Export, bitte später erneut versuchen')
+
+    def release(self):
+        """Platz wieder freigeben (nach dem Schliessen der Antwort)"""
+        self._slots.release()
+
+    def render(self, items):
+        """items: (Name, Gespräch, MA, FK, Jahr); liefert (Name, Bytes) sobald fertig"""
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        # Nur begrenzt viele PDFs gleichzeitig im Speicher
+        limit = self.max_workers * 2
+        items = iter(items)
+        in_flight = {}
+
+        def fill():
+            while len(in_flight) < limit:
+                item = next(items, None)
+                if item is None:
+                    break
+                name, gespraech, ma, fk, year = item
+                in_flight[executor.submit(render_pdf_bytes, gespraech, ma, fk, year)] = name
+
+        try:
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = in_flight.pop(future)
+                    try:
+                        yield name, future.result()
+                    except Exception as e:
+                        print(f"❌ PDF-Fehler im Export ({name}): {e}")
+                        error_name = 'FEHLER_' + name[:-len('.pdf')] + '.txt'
+                        yield error_name, f"PDF konnte nicht erstellt werden: {e}\n".encode('utf-8')
+                fill()
+        finally:
+            # Auch bei Verbindungsabbruch aufräumen
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,62 @@
+## ⚙️ **Konfiguration - config.py**
+
+import os
+from pathlib import Path
+
+# Pfade (relativ zum Script)
+BASE_DIR = Path(__file__).parent.parent
+# Datenordner (z.B. für Benchmarks mit generierten Daten: MAG_DATA_DIR)
+DATA_DIR = Path(os.environ.get('MAG_DATA_DIR', BASE_DIR / "data"))
+PDF_DIR = DATA_DIR / "pdf_export"
+PDF_JOB_DIR = DATA_DIR / "pdf_jobs"
+
+# Speicher-Backend: 'csv' (Standard) oder 'sqlite'
+STORAGE_BACKEND = os.environ.get('MAG_STORAGE', 'csv').strip().lower()
+SQLITE_PATH = Path(os.environ.get('MAG_SQLITE_PATH', DATA_DIR / 'mag.sqlite3'))
+
+# Laufender Gesprächszyklus; abgeschlossene Jahre liegen schreibgeschützt im Archiv
+REVIEW_YEAR = int(os.environ.get('MAG_REVIEW_YEAR', 2025))
+ARCHIVE_DIR = Path(os.environ.get('MAG_ARCHIVE_DIR', DATA_DIR / 'archiv'))
+
+# Journal für Gesprächsänderungen ab dieser Grösse in die CSV übernehmen
+JOURNAL_COMPACT_BYTES = int(os.environ.get('MAG_JOURNAL_COMPACT_BYTES', 1024 * 1024))
+
+# JSON-Antworten ab dieser Grösse komprimieren (gzip/brotli)
+COMPRESS_MIN_BYTES = int(os.environ.get('MAG_COMPRESS_MIN_BYTES', 1024))
+
+# PDF-Erstellung: Prozesse pro Server-Worker und maximal offene Aufträge
+PDF_WORKERS = int(os.environ.get('MAG_PDF_WORKERS', 2))
+PDF_QUEUE_LIMIT = int(os.environ.get('MAG_PDF_QUEUE_LIMIT', 100))
+
+# PDF-Cache: maximale Grösse von pdf_export, älteste Downloads werden zuerst gelöscht
+PDF_CACHE_MAX_BYTES = int(os.environ.get('MAG_PDF_CACHE_MAX_BYTES', 500 * 1024 * 1024))
+
+# Opt-in: Führungskräfte sehen mit 1 auch Gespräche ihrer indirekt Unterstellten (Standard: nur eigene)
+FK_SUBTREE = os.environ.get('MAG_FK_SUBTREE', '0') == '1'
+
+# Threads pro Server-Prozess (serve.py setzt den Wert aus --threads)
+SERVER_THREADS = int(os.environ.get('MAG_THREADS', 4))
+
+# Server-Sent Events: gleichzeitig offene Streams pro Server-Prozess. Jeder Stream belegt
+# einen Thread: Standard die Hälfte, immer mindestens ein Thread frei für normale Anfragen
+EVENT_STREAM_LIMIT = min(
+    int(os.environ.get('MAG_EVENT_STREAMS', SERVER_THREADS // 2)),
+    max(SERVER_THREADS - 1, 0)
+)
+
+# Sammel-Export: Prozesse pro Export (Standard: alle Kerne)
+EXPORT_WORKERS = int(os.environ.get('MAG_EXPORT_WORKERS', os.cpu_count() or 1))
+
+# Excel-Import der Stammdaten: maximale Dateigrösse
+IMPORT_MAX_BYTES = int(os.environ.get('MAG_IMPORT_MAX_BYTES', 20 * 1024 * 1024))
+
+# Metriken: Ordner für die Werte der einzelnen Prozesse, Token für /api/metrics (sonst nur HR);
+# anonymer Abruf nur ausdrücklich mit MAG_METRICS_PUBLIC=1
+METRICS_DIR = Path(os.environ.get('MAG_METRICS_DIR', DATA_DIR / 'metrics'))
+METRICS_TOKEN = os.environ.get('MAG_METRICS_TOKEN', '')
+METRICS_PUBLIC = os.environ.get('MAG_METRICS_PUBLIC', '0') == '1'
+
+# Profiling (opt-in): Anteil profilierter Anfragen (z.B. 0.05), so viele langsamste behalten
+PROFILE_SAMPLE_RATE = float(os.environ.get('MAG_PROFILE_SAMPLE', 0))
+PROFILE_KEEP = int(os.environ.get('MAG_PROFILE_KEEP', 20))
+PROFILE_DIR = Path(os.environ.get('MAG_PROFILE_DIR', DATA_DIR / 'profiles'))
@@ -0,0 +1,441 @@
+## 🗄️ **Datenhaltung - datastore.py**
+
+import os
+import csv
+import stat
+import time
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from journal import Journal
+from locking import file_lock
+from metrics import metrics
+
+# So viele geänderte Schlüssel merken, ältere Stände werden komplett neu gelesen
+CHANGE_LOG_SIZE = 10000
+
+# Temporäre Dateien, die älter sind, stammen von abgebrochenen Prozessen
+STALE_TMP_SECONDS = 3600
+
+# Spalten mit ganzzahligen Werten (wie im SQLite-Backend), alle anderen bleiben Text
+INTEGER_COLUMNS = {'Gespraechs_ID', 'MA_PersonalNr', 'FK_PersonalNr', 'PersonalNr'}
+
+
+def parse_int(value):
+    """'67890' (oder '67890.0' aus älteren pandas-Exporten) -> 67890, sonst unverändert"""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return value
+
+
+def remove_stale_tmp(path):
+    """Liegengebliebene temporäre Dateien (z.B. gespraeche.csv.*.tmp) entfernen"""
+    limit = time.time() - STALE_TMP_SECONDS
+    for tmp_path in path.parent.glob(f"{path.name}.*.tmp"):
+        try:
+            if tmp_path.stat().st_mtime < limit:
+                tmp_path.unlink()
+                print(f"🧹 Alte temporäre Datei entfernt: {tmp_path.name}")
+        except OSError:
+            pass
+
+
+class ConflictError(Exception):
+    """Datensatz wurde seit dem Laden durch den Client geändert"""
+
+    def __init__(self, current):
+        super().__init__('Datensatz wurde inzwischen geändert')
+        self.current = current
+
+
+class CsvTable:
+    """CSV-Datei im Speicher halten, indexiert nach einer Schlüsselspalte.
+
+    Die Datei wird nur neu gelesen, wenn sich Änderungszeit oder Grösse
+    geändert haben. Schreibzugriffe laufen über die Tabelle, damit Speicher
+    und Datei konsistent bleiben.
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.columns = []
+        self.version = 0
+        self._rows = {}
+        self._signature = None
+        self._changes = deque()
+        self._changes_floor = 0
+        self._lock = threading.RLock()
+        self.lock_path = path.with_name(path.name + '.lock')
+        remove_stale_tmp(path)
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        # stdlib csv statt pandas: leere Felder bleiben '', Ganzzahl-Spalten werden int
+        with metrics.span('csv_load'), open(self.path, encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            columns = next(reader, [])
+            integer = [column in INTEGER_COLUMNS for column in columns]
+            rows = {}
+            for values in reader:
+                if not values:
+                    continue
+                values += [''] * (len(columns) - len(values))
+                record = {
+                    column: parse_int(value) if is_int and value != '' else value
+                    for column, value, is_int in zip(columns, values, integer)
+                }
+                rows[int(record[self.key])] = record
+        self.columns = columns
+        self._rows = rows
+        self.version += 1
+        # Ältere Änderungslisten gelten nicht mehr
+        self._changes.clear()
+        self._changes_floor = self.version
+
+    def _log_change(self, key):
+        self._changes.append((self.version, key))
+        if len(self._changes) > CHANGE_LOG_SIZE:
+            self._changes_floor = self._changes.popleft()[0]
+
+    def changes_since(self, version):
+        """Seit version geänderte Schlüssel als (aktuelle Version, Schlüssel).
+
+        Schlüssel ist None, wenn die Tabelle seither neu geladen wurde
+        oder die Änderungsliste nicht so weit zurückreicht.
+        """
+        with self._lock:
+            self.refresh()
+            if version < self._changes_floor:
+                return self.version, None
+            keys = set()
+            for changed_version, key in reversed(self._changes):
+                if changed_version <= version:
+                    break
+                keys.add(key)
+            return self.version, keys
+
+    def refresh(self):
+        """Neu laden, falls sich die Datei seit dem letzten Lesen geändert hat"""
+        with self._lock:
+            signature = self._file_signature()
+            if signature != self._signature:
+                self._load()
+                self._signature = signature
+
+    def state(self):
+        """Dateistand, aus dem der Speicherinhalt stammt"""
+        self.refresh()
+        return self._signature
+
+    def get(self, key):
+        """Einzelne Zeile als Kopie oder None"""
+        self.refresh()
+        row = self._rows.get(int(key))
+        return dict(row) if row is not None else None
+
+    def rows(self):
+        """Alle Zeilen (nicht verändern!)"""
+        self.refresh()
+        return list(self._rows.values())
+
+    def update(self, key, fields, expected=None):
+        """Felder einer Zeile ändern und Datei zurückschreiben.
+
+        expected: optionale Vorbedingung {Spalte: Wert}, sonst ConflictError
+        """
+        status, row = self.update_many([(key, fields, expected)])[0]
+        if status == 'conflict':
+            raise ConflictError(row)
+        return row
+
+    def update_many(self, updates):
+        """Mehrere Zeilen [(key, fields, expected)] mit einem Schreibzugriff ändern.
+
+        Gibt pro Änderung (status, Zeile) zurück: 'ok' mit neuer Zeile,
+        'conflict' mit aktueller Zeile oder 'not_found' mit None.
+        """
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            results, changes = self._check_batch(updates)
+            if changes:
+                for key, fields in changes:
+                    self._rows[key].update(fields)
+                    for column in fields:
+                        if column not in self.columns:
+                            self.columns.append(column)
+                self._write()
+                self.version += 1
+                for key, _ in changes:
+                    self._log_change(key)
+            return self._batch_results(results)
+
+    def _check_batch(self, updates):
+        # Vorbedingungen prüfen, spätere Änderungen sehen frühere derselben Zeile
+        results, changes, pending = [], [], {}
+        for key, fields, expected in updates:
+            key = int(key)
+            row = pending.get(key) or self._rows.get(key)
+            if row is None:
+                results.append(('not_found', None))
+                continue
+            try:
+                _check_expected(row, expected)
+            except ConflictError as e:
+                results.append(('conflict', e.current))
+                continue
+            pending[key] = {**row, **fields}
+            changes.append((key, fields))
+            results.append(('ok', key))
+        return results, changes
+
+    def _batch_results(self, results):
+        return [(status, dict(self._rows[value]) if status == 'ok' else value)
+                for status, value in results]
+
+    def _write(self):
+        os.replace(self._write_tmp(list(self._rows.values()), self.columns), self.path)
+        self._signature = self._file_signature()
+
+    def replace_all(self, build):
+        """Alle Zeilen mit build(rows, columns) -> (rows, columns) oder None ersetzen.
+
+        Lesen und Schreiben unter dem Schreib-Lock (ein atomares Ersetzen der Datei).
+        """
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            result = build([dict(row) for row in self._rows.values()], list(self.columns))
+            if result is not None:
+                rows, columns = result
+                os.replace(self._write_tmp(rows, columns), self.path)
+                self.refresh()
+
+    def _write_tmp(self, rows, columns):
+        # Erst in temporäre Datei schreiben, danach atomar ersetzen;
+        # eindeutiger Name pro Aufruf (Komprimierung läuft in einem eigenen Thread)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{self.path.name}.", suffix='.tmp', dir=self.path.parent)
+        try:
+            with metrics.span('csv_write'), open(fd, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow(columns)
+                writer.writerows([row.get(column, '') for column in columns] for row in rows)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp legt 0600 an: Rechte der bisherigen Datei übernehmen (Backups, Admin-Skripte)
+            try:
+                mode = stat.S_IMODE(os.stat(self.path).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+
+class JournaledCsvTable(CsvTable):
+    """CsvTable, deren Änderungen an ein Journal angehängt statt die ganze
+    CSV neu geschrieben werden.
+
+    Beim Laden wird das Journal auf die CSV angewendet. Erreicht es
+    compact_bytes, wird es im Hintergrund in die CSV übernommen.
+    """
+
+    def __init__(self, path, key, journal_path, compact_bytes):
+        super().__init__(path, key)
+        self.journal = Journal(journal_path)
+        remove_stale_tmp(journal_path)
+        self.compact_bytes = compact_bytes
+        self._journal_id = None
+        self._journal_offset = 0
+        self._compacting = False
+
+    def refresh(self):
+        """Neu laden bei geänderter CSV, sonst nur neue Journal-Einträge anwenden"""
+        with self._lock:
+            signature = self._file_signature()
+            journal_id, journal_size = self.journal.stat()
+            if (signature != self._signature or journal_id != self._journal_id
+                    or journal_size < self._journal_offset):
+                self._load()
+                self._signature = signature
+                self._journal_id = journal_id
+                self._journal_offset = 0
+            if journal_size > self._journal_offset:
+                self._replay()
+
+    def state(self):
+        with self._lock:
+            self.refresh()
+            return (self._signature, self._journal_id, self._journal_offset)
+
+    def _replay(self):
+        entries, self._journal_offset = self.journal.read_from(self._journal_offset)
+        if entries:
+            self.version += 1
+        for entry in entries:
+            row = self._rows.get(int(entry['key']))
+            if row is None:
+                continue
+            row.update(entry['fields'])
+            for column in entry['fields']:
+                if column not in self.columns:
+                    self.columns.append(column)
+            self._log_change(int(entry['key']))
+
+    def update_many(self, updates):
+        """Änderungen ins Journal schreiben (ein fsync) und im Speicher anwenden"""
+        journal_size = 0
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            results, changes = self._check_batch(updates)
+            if changes:
+                with metrics.span('journal_write'):
+                    journal_size = self.journal.append_many(changes)
+                self.refresh()
+            results = self._batch_results(results)
+
+        if journal_size >= self.compact_bytes:
+            self.compact_in_background()
+        return results
+
+    def compact_in_background(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        # Kein Daemon-Thread: beim Beenden wird die Komprimierung noch abgeschlossen,
+        # statt eine halb geschriebene temporäre Datei zu hinterlassen
+        threading.Thread(target=self.compact, name='journal-compact').start()
+
+    def compact(self):
+        """Journal in die CSV übernehmen (atomares Ersetzen, dann Journal kürzen)"""
+        try:
+            with self._lock, file_lock(self.lock_path):
+                self.refresh()
+                rows = [dict(row) for row in self._rows.values()]
+                columns = list(self.columns)
+                offset = self._journal_offset
+                snapshot = (self._signature, self._journal_id)
+
+            # Schreiben ohne Lock, Änderungen laufen weiter ins Journal
+            tmp_path = self._write_tmp(rows, columns)
+
+            with self._lock, file_lock(self.lock_path):
+                if (self._file_signature(), self.journal.stat()[0]) != snapshot:
+                    # Ein anderer Prozess hat inzwischen komprimiert
+                    os.remove(tmp_path)
+                    return
+                os.replace(tmp_path, self.path)
+                # Stürzt der Prozess hier ab, wird das Journal beim nächsten
+                # Laden erneut angewendet, was dasselbe Ergebnis liefert.
+                self.journal.drop_prefix(offset)
+                self._signature = self._file_signature()
+                self._journal_id, _ = self.journal.stat()
+                self._journal_offset = 0
+                self.refresh()
+            print(f"🗜️  Journal in {self.path.name} übernommen ({len(rows)} Zeilen)")
+        except Exception as e:
+            print(f"❌ Journal-Komprimierung fehlgeschlagen: {e}")
+        finally:
+            self._compacting = False
+
+    def take_all(self, handle):
+        """Alle Zeilen an handle(rows, columns) übergeben, danach CSV und Journal leeren.
+
+        Läuft unter dem Schreib-Lock, damit keine Änderung dazwischen verloren geht.
+        """
+        with self._lock, file_lock(self.lock_path):
+            self.refresh()
+            handle([dict(row) for row in self._rows.values()], list(self.columns))
+            os.replace(self._write_tmp([], self.columns), self.path)
+            self.journal.drop_prefix(self.journal.stat()[1])
+            self.refresh()
+
+
+def _check_expected(row, expected):
+    for column, value in (expected or {}).items():
+        if str(row.get(column, '')) != str(value):
+            raise ConflictError(dict(row))
+
+
+class DataStore:
+    """Gespräche und Stammdaten, gemeinsam für alle Handler"""
+
+    def __init__(self, data_dir, journal_compact_bytes=1024 * 1024):
+        self.gespraeche = JournaledCsvTable(
+            data_dir / 'gespraeche.csv',
+            'Gespraechs_ID',
+            data_dir / 'gespraeche.journal',
+            journal_compact_bytes
+        )
+        self.stammdaten = CsvTable(data_dir / 'stammdaten.csv', 'PersonalNr')
+
+    @property
+    def version(self):
+        """Datenstand aller Tabellen (in allen Worker-Prozessen identisch)"""
+        state = repr((self.gespraeche.state(), self.stammdaten.state()))
+        return hashlib.sha1(state.encode('utf-8')).hexdigest()[:16]
+
+    def changes_since(self, token):
+        """Seit token geänderte Gesprächs-IDs als (neues Token, IDs oder None).
+
+        None bedeutet: alles neu berechnen (erster Aufruf, neu geladene
+        Tabellen oder geänderte Stammdaten).
+        """
+        gespraeche_version, stammdaten_version = token or (-1, -1)
+        self.stammdaten.refresh()
+        new_stammdaten_version = self.stammdaten.version
+        new_gespraeche_version, keys = self.gespraeche.changes_since(gespraeche_version)
+        if token is None or new_stammdaten_version != stammdaten_version:
+            keys = None
+        return (new_gespraeche_version, new_stammdaten_version), keys
+
+    def list_gespraeche(self, fk_personal_nr=None):
+        """Alle Gespräche, optional nur die einer Führungskraft (oder einer Menge von FKs)"""
+        rows = self.gespraeche.rows()
+        if isinstance(fk_personal_nr, (set, frozenset)):
+            rows = [g for g in rows if g['FK_PersonalNr'] in fk_personal_nr]
+        elif fk_personal_nr is not None:
+            rows = [g for g in rows if g['FK_PersonalNr'] == fk_personal_nr]
+        return rows
+
+    def get_gespraech(self, gespraechs_id):
+        return self.gespraeche.get(gespraechs_id)
+
+    @property
+    def stammdaten_version(self):
+        """Stand der Stammdaten (pro Prozess)"""
+        self.stammdaten.refresh()
+        return self.stammdaten.version
+
+    def list_mitarbeiter(self):
+        return self.stammdaten.rows()
+
+    def get_mitarbeiter(self, personal_nr):
+        if personal_nr == '':
+            return None
+        return self.stammdaten.get(personal_nr)
+
+    def update_gespraech(self, gespraechs_id, fields, expected=None):
+        return self.gespraeche.update(gespraechs_id, fields, expected)
+
+    def update_gespraeche(self, updates):
+        """Mehrere Gespräche [(id, fields, expected)] in einem Schreibvorgang ändern"""
+        return self.gespraeche.update_many(updates)
+
+    def replace_stammdaten(self, build):
+        """Stammdaten mit build(rows, columns) -> (rows, columns) oder None ersetzen"""
+        self.stammdaten.replace_all(build)
+
+    def archive_gespraeche(self, handle):
+        """Alle Gespräche an handle(rows, columns) übergeben und danach entfernen"""
+        self.gespraeche.take_all(handle)
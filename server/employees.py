@@ -0,0 +1,152 @@
+## 👥 **Mitarbeitenden-Index - employees.py**
+
+import threading
+
+
+class Employee:
+    """Mitarbeitende:r aus den Stammdaten, Anzeigename vorberechnet"""
+
+    __slots__ = ('personal_nr', 'nachname', 'vorname', 'email', 'abteilung', 'fk_personal_nr', 'name')
+
+    def __init__(self, row):
+        self.personal_nr = int(row['PersonalNr'])
+        self.nachname = row.get('Nachname', '')
+        self.vorname = row.get('Vorname', '')
+        self.email = row.get('Email', '')
+        self.abteilung = row.get('Abteilung', '')
+        fk = row.get('FK_PersonalNr', '')
+        self.fk_personal_nr = int(fk) if fk != '' else ''
+        self.name = f"{self.vorname} {self.nachname}".strip()
+
+    def as_dict(self):
+        """Stammdaten-Zeile (z.B. für PDF-Prozesse)"""
+        return {
+            'PersonalNr': self.personal_nr,
+            'Nachname': self.nachname,
+            'Vorname': self.vorname,
+            'Email': self.email,
+            'Abteilung': self.abteilung,
+            'FK_PersonalNr': self.fk_personal_nr
+        }
+
+
+class OrgTree:
+    """FK-Hierarchie als Euler-Tour: alle Unterstellten einer Person liegen
+    im Intervall [start, end) ihrer Position.
+
+    Damit ist "ist (indirekt) unterstellt" ein Vergleich zweier Zahlen.
+    Personalnummern, die nur als FK vorkommen (nicht in den Stammdaten),
+    werden als eigene Knoten geführt.
+    """
+
+    def __init__(self, employees):
+        children = {}
+        parent = {}
+        nodes = set()
+        for employee in employees:
+            nodes.add(employee.personal_nr)
+            fk = employee.fk_personal_nr
+            if fk != '' and fk != employee.personal_nr:
+                nodes.add(fk)
+                parent[employee.personal_nr] = fk
+                children.setdefault(fk, []).append(employee.personal_nr)
+
+        self._start = {}
+        self._end = {}
+        self._order = []
+        self._subtrees = {}
+
+        # Wurzeln zuerst, danach Zyklen in den Stammdaten (ohne Wurzel) auflösen
+        roots = sorted(n for n in nodes if n not in parent)
+        for root in roots + sorted(nodes):
+            if root in self._start:
+                continue
+            self._visit(root, children)
+
+    def _visit(self, root, children):
+        # Iterativ statt rekursiv (tiefe Hierarchien)
+        self._start[root] = len(self._order)
+        self._order.append(root)
+        stack = [(root, iter(sorted(children.get(root, ()))))]
+        while stack:
+            node, pending = stack[-1]
+            child = next(pending, None)
+            if child is None:
+                self._end[node] = len(self._order)
+                stack.pop()
+            elif child not in self._start:
+                self._start[child] = len(self._order)
+                self._order.append(child)
+                stack.append((child, iter(sorted(children.get(child, ())))))
+
+    def contains(self, manager, personal_nr):
+        """True, wenn personal_nr die Person selbst oder (indirekt) unterstellt ist"""
+        if manager == personal_nr:
+            return True
+        start = self._start.get(manager)
+        position = self._start.get(personal_nr)
+        if start is None or position is None:
+            return False
+        return start < position < self._end[manager]
+
+    def subtree(self, manager):
+        """Personalnummern der Person und aller (indirekt) Unterstellten"""
+        subtree = self._subtrees.get(manager)
+        if subtree is None:
+            start = self._start.get(manager)
+            if start is None:
+                subtree = frozenset([manager])
+            else:
+                subtree = frozenset(self._order[start:self._end[manager]])
+            self._subtrees[manager] = subtree
+        return subtree
+
+
+class EmployeeIndex:
+    """Alle Mitarbeitenden nach Personalnummer, einmal pro Stammdaten-Stand gebaut.
+
+    current() liefert das Dict für den aktuellen Stand; Joins holen es
+    einmal und schlagen danach nur noch im Dict nach. org() liefert die
+    Hierarchie zum selben Stand.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._version = None
+        self._by_nr = {}
+        self._org = OrgTree([])
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        version = self.store.stammdaten_version
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    by_nr = {
+                        employee.personal_nr: employee
+                        for employee in map(Employee, self.store.list_mitarbeiter())
+                    }
+                    self._org = OrgTree(by_nr.values())
+                    self._by_nr = by_nr
+                    self._version = version
+
+    def current(self):
+        """{PersonalNr: Employee} für den aktuellen Stammdaten-Stand"""
+        self._refresh()
+        return self._by_nr
+
+    def org(self):
+        """OrgTree für den aktuellen Stammdaten-Stand"""
+        self._refresh()
+        return self._org
+
+    def get(self, personal_nr):
+        """Employee oder None (auch für leere/unbekannte Nummern)"""
+        if personal_nr == '':
+            return None
+        return self.current().get(int(personal_nr))
+
+    def get_dict(self, personal_nr):
+        """Stammdaten-Zeile als Dict oder None"""
+        employee = self.get(personal_nr)
+        return employee.as_dict() if employee is not None else None
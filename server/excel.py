@@ -0,0 +1,244 @@
+## 📗 **Excel Import/Export - excel.py**
+
+import re
+import zipfile
+import tempfile
+from datetime import date, datetime
+from datastore import INTEGER_COLUMNS
+from metrics import metrics
+
+# Spalten des Gesprächs-Exports (Gespräch plus Name/Abteilung aus den Stammdaten)
+EXPORT_COLUMNS = [
+    'Gespraechs_ID', 'MA_PersonalNr', 'Vorname', 'Nachname', 'Abteilung',
+    'FK_PersonalNr', 'FK_Name', 'Datum', 'Status', 'Ziele_2025', 'Entwicklung',
+    'Feedback', 'Erstellt_am', 'Geaendert_am', 'Abgeschlossen_am'
+]
+
+# Stammdaten in dieser Reihenfolge, weitere Spalten der Datei werden angehängt
+STAMMDATEN_COLUMNS = ['PersonalNr', 'Nachname', 'Vorname', 'Email', 'Abteilung', 'FK_PersonalNr']
+REQUIRED_COLUMNS = ['PersonalNr', 'Nachname', 'Vorname']
+STAMMDATEN_SHEET = 'Stammdaten'
+
+# Spaltenbreiten im Export (Zeichen), übrige Spalten 14
+COLUMN_WIDTHS = {'Ziele_2025': 50, 'Entwicklung': 50, 'Feedback': 50, 'Email': 30, 'FK_Name': 24}
+
+# Höchstens so viele Fehler in der Antwort auflisten
+MAX_ERRORS = 50
+
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# Steuerzeichen sind in XLSX nicht erlaubt
+ILLEGAL_CHARACTERS = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+
+class WorkbookError(ValueError):
+    """Datei ist keine lesbare Stammdaten-Arbeitsmappe"""
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def write_workbook(sheets):
+    """Tabellenblätter [(Name, Spalten, Zeilen)] im Write-only-Modus schreiben.
+
+    Zeilen werden einzeln in eine temporäre Datei geschrieben (konstanter
+    Speicher, auch bei grossen Organisationen). Gibt die Datei an Position 0 zurück.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    with metrics.span('xlsx_write'):
+        for name, columns, rows in sheets:
+            sheet = workbook.create_sheet(name)
+            sheet.freeze_panes = 'A2'
+            for i, column in enumerate(columns):
+                sheet.column_dimensions[_column_letter(i)].width = COLUMN_WIDTHS.get(column, 14)
+            sheet.auto_filter.ref = f"A1:{_column_letter(len(columns) - 1)}1"
+
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(sheet, value=column)
+                cell.font = Font(bold=True)
+                header.append(cell)
+            sheet.append(header)
+
+            for row in rows:
+                values = []
+                for column in columns:
+                    value = row.get(column, '')
+                    if value == '':
+                        value = None
+                    elif isinstance(value, str):
+                        value = ILLEGAL_CHARACTERS.sub('', value)
+                        if value.startswith('='):
+                            # Freitext nie als Formel auswerten
+                            value = WriteOnlyCell(sheet, value=value)
+                            value.data_type = 's'
+                    values.append(value)
+                sheet.append(values)
+
+        f = tempfile.TemporaryFile()
+        workbook.save(f)
+    f.seek(0)
+    return f
+
+
+def iter_file(f, chunk_size=64 * 1024):
+    """Datei blockweise ausgeben und danach schliessen"""
+    try:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        # Datum ohne Uhrzeit wie in den CSVs als JJJJ-MM-TT
+        midnight = value.hour == value.minute == value.second == 0
+        return value.strftime('%Y-%m-%d' if midnight else '%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _integer(value):
+    # 12345, 12345.0 oder '12345' -> 12345, sonst ValueError
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError
+        return int(value)
+    return int(str(value).strip())
+
+
+def read_stammdaten(file):
+    """Stammdaten-Blatt im Read-only-Modus lesen und prüfen.
+
+    Nimmt das Blatt 'Stammdaten' (wie im Export) oder das erste Blatt.
+    Gibt (Spalten, [(Excel-Zeile, Datensatz)], Fehler) zurück.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError):
+        raise WorkbookError('Keine gültige Excel-Datei (.xlsx)')
+
+    try:
+        with metrics.span('xlsx_read'):
+            if STAMMDATEN_SHEET in workbook.sheetnames:
+                sheet = workbook[STAMMDATEN_SHEET]
+            else:
+                sheet = workbook.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+
+            header = [_text(value) for value in next(rows, ())]
+            missing = [column for column in REQUIRED_COLUMNS if column not in header]
+            if missing:
+                raise WorkbookError(f"Spalten fehlen in Blatt '{sheet.title}': {', '.join(missing)}")
+            # Leere und doppelte Überschriften ignorieren
+            positions = {}
+            for i, column in enumerate(header):
+                if column and column not in positions:
+                    positions[column] = i
+            columns = list(positions)
+
+            records, errors, seen = [], [], {}
+            for line, values in enumerate(rows, start=2):
+                if values is None or all(value is None or value == '' for value in values):
+                    continue
+                values = list(values) + [None] * (len(header) - len(values))
+                record, problems = {}, []
+                for column, i in positions.items():
+                    value = values[i]
+                    if column in INTEGER_COLUMNS:
+                        if value is None or value == '':
+                            record[column] = ''
+                        else:
+                            try:
+                                record[column] = _integer(value)
+                            except ValueError:
+                                problems.append(f"{column} '{_text(value)}' ist keine Personalnummer")
+                                record[column] = ''
+                    else:
+                        record[column] = _text(value)
+
+                personal_nr = record['PersonalNr']
+                if personal_nr == '' and not any(p.startswith('PersonalNr') for p in problems):
+                    problems.append('PersonalNr fehlt')
+                elif personal_nr in seen:
+                    problems.append(f"PersonalNr {personal_nr} schon in Zeile {seen[personal_nr]}")
+                elif personal_nr != '':
+                    seen[personal_nr] = line
+                for column in ('Nachname', 'Vorname'):
+                    if not record[column]:
+                        problems.append(f"{column} fehlt")
+                if record.get('Email') and not EMAIL.match(record['Email']):
+                    problems.append(f"Email '{record['Email']}' ist ungültig")
+                if personal_nr != '' and record.get('FK_PersonalNr') == personal_nr:
+                    problems.append('FK_PersonalNr ist die eigene Personalnummer')
+
+                if problems:
+                    errors.append(f"Zeile {line}: {'; '.join(problems)}")
+                else:
+                    records.append((line, record))
+    finally:
+        workbook.close()
+
+    return columns, records, errors
+
+
+def merge_stammdaten(current, current_columns, columns, records, replace=False):
+    """Importierte Datensätze mit den bestehenden Stammdaten zusammenführen.
+
+    Bestehende Personen werden aktualisiert, neue angehängt; mit replace
+    werden Personen entfernt, die nicht in der Datei stehen.
+    Gibt (Zeilen, Spalten, Zusammenfassung, Warnungen) zurück.
+    """
+    all_columns = list(current_columns) or [c for c in STAMMDATEN_COLUMNS if c in columns]
+    all_columns += [column for column in columns if column not in all_columns]
+
+    imported = {record['PersonalNr']: record for _, record in records}
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    rows = []
+    for row in current:
+        record = imported.pop(row['PersonalNr'], None)
+        if record is None:
+            if replace:
+                summary['removed'] += 1
+                continue
+            rows.append(row)
+            continue
+        new_row = {**row, **record}
+        changed = any(str(row.get(column, '')) != str(new_row.get(column, '')) for column in all_columns)
+        summary['updated' if changed else 'unchanged'] += 1
+        rows.append(new_row)
+    for record in imported.values():
+        rows.append({column: record.get(column, '') for column in all_columns})
+        summary['inserted'] += 1
+
+    # Führungskräfte ohne eigene Zeile sind erlaubt (z.B. HR), neue davon meist ein Tippfehler
+    known = {row['PersonalNr'] for row in rows} | {row.get('FK_PersonalNr', '') for row in current}
+    warnings = [
+        f"Zeile {line}: FK_PersonalNr {record['FK_PersonalNr']} steht nicht in den Stammdaten"
+        for line, record in records
+        if record.get('FK_PersonalNr', '') != '' and record['FK_PersonalNr'] not in known
+    ]
+    return rows, all_columns, summary, warnings
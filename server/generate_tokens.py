@@ -1,106 +1,188 @@
 ## 🔑 **Token-Generator - generate_tokens.py**
 
+import os
+import argparse
 import pandas as pd
 import secrets
-import hashlib
 from datetime import datetime, timedelta
-from pathlib import Path
-
-def generate_tokens():
-    """Generiert Zugangs-Tokens für alle Führungskräfte"""
-    
-    # Relativer Pfad zum data-Ordner
-    data_dir = Path(__file__).parent.parent / "data"
-    
+from config import DATA_DIR
+
+HR_PERSONAL_NR = 99999
+TOKEN_COLUMNS = ['Token', 'PersonalNr', 'Name', 'Email', 'Rolle', 'Gueltig_bis', 'Erstellt_am']
+
+
+def load_managers(df_stamm):
+    """Alle Führungskräfte mit Anzahl Direct Reports (ein Durchgang per groupby)"""
+    fk_nrs = df_stamm['FK_PersonalNr'].dropna().astype(int)
+    direct_reports = fk_nrs.groupby(fk_nrs).size().rename('Direct_Reports')
+
+    stamm = df_stamm.assign(PersonalNr=df_stamm['PersonalNr'].astype(int))
+    stamm = stamm.drop_duplicates('PersonalNr').set_index('PersonalNr')
+    # FKs ohne eigene Stammdaten-Zeile bekommen keinen Token (wie bisher)
+    managers = stamm.join(direct_reports, how='inner')
+    return managers.sort_index()
+
+
+def new_token(personal_nr, name, email, rolle, valid_days):
+    """Neuer Token-Eintrag (FK[PersonalNr]_[Random] bzw. HR_MASTER_[Random])"""
+    if rolle == 'HR':
+        token = f"HR_MASTER_{secrets.token_urlsafe(24)}"
+    else:
+        token = f"FK{personal_nr:05d}_{secrets.token_urlsafe(16)}"
+    now = datetime.now()
+    return {
+        'Token': token,
+        'PersonalNr': personal_nr,
+        'Name': name,
+        'Email': '' if pd.isna(email) else email,
+        'Rolle': rolle,
+        'Gueltig_bis': (now + timedelta(days=valid_days)).strftime('%Y-%m-%d'),
+        'Erstellt_am': now.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def write_tokens(path, tokens):
+    """tokens.csv atomar ersetzen (der Server sieht nie eine halbe Datei)"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    df = pd.DataFrame(tokens, columns=TOKEN_COLUMNS)
+    with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def rotate(existing, managers, valid_days, renew_days, revoke):
+    """Bestehende Tokens behalten, nur fehlende, ablaufende und gesperrte neu ausstellen.
+
+    Gibt (alle Tokens, neu ausgestellte Tokens, entfernte Tokens) zurück.
+    """
+    renew_before = datetime.now() + timedelta(days=renew_days)
+    valid_until = pd.to_datetime(existing['Gueltig_bis'], errors='coerce')
+    latest = {}
+    for record, gueltig_bis in zip(existing.to_dict('records'), valid_until):
+        if pd.isna(record['Token']) or pd.isna(record['PersonalNr']):
+            continue
+        key = (int(record['PersonalNr']), record['Rolle'])
+        gueltig_bis = pd.Timestamp.min if pd.isna(gueltig_bis) else gueltig_bis
+        # Pro Person und Rolle der am längsten gültige Token
+        if key not in latest or gueltig_bis > latest[key][1]:
+            latest[key] = (record, gueltig_bis)
+    current = {key: (record, gueltig_bis < renew_before) for key, (record, gueltig_bis) in latest.items()}
+
+    wanted = {(nr, 'FK'): (f"{row['Vorname']} {row['Nachname']}", row.get('Email', ''))
+              for nr, row in managers.iterrows()}
+    wanted[(HR_PERSONAL_NR, 'HR')] = ('HR Team', 'hr@zh.ch')
+
+    tokens, issued = [], []
+    for key, (name, email) in wanted.items():
+        personal_nr, rolle = key
+        record, expiring = current.get(key, (None, True))
+        if record is None or expiring or personal_nr in revoke:
+            record = new_token(personal_nr, name, email, rolle, valid_days)
+            issued.append(record)
+        else:
+            record = {**record, 'PersonalNr': personal_nr}
+        tokens.append(record)
+
+    removed = [record for key, (record, _) in current.items() if key not in wanted]
+    return tokens, issued, removed
+
+
+def generate_tokens(rotate_only=False, valid_days=365, renew_days=30, revoke=()):
+    """Generiert Zugangs-Tokens für alle Führungskräfte (oder rotiert nur die nötigen)"""
+
+    # Gleicher data-Ordner wie der Server (MAG_DATA_DIR)
+    data_dir = DATA_DIR
+    tokens_path = data_dir / "tokens.csv"
+
     print("=" * 70)
-    print("🔑 TOKEN-GENERATOR")
+    print("🔑 TOKEN-ROTATION" if rotate_only else "🔑 TOKEN-GENERATOR")
     print("=" * 70)
     print()
-    
+
     # Stammdaten laden
     print("📥 Lade Stammdaten...")
     df_stamm = pd.read_csv(data_dir / "stammdaten.csv", encoding='utf-8-sig')
     print(f"   ✓ {len(df_stamm)} Mitarbeitende geladen")
     print()
-    
-    # Alle einzigartigen FKs finden
-    fks = df_stamm['FK_PersonalNr'].dropna().unique()
-    
-    print(f"📊 Gefunden: {len(fks)} Führungskräfte")
-    print()
-    
-    tokens = []
-    
-    # Pro FK einen Token generieren
-    for fk_nr in fks:
-        fk_nr_int = int(fk_nr)
-        fk_data = df_stamm[df_stamm['PersonalNr'] == fk_nr_int]
-        
-        if not fk_data.empty:
-            # Token mit Format: FK[PersonalNr]_[Random]
-            token = f"FK{fk_nr_int:05d}_{secrets.token_urlsafe(16)}"
-            
-            fk_row = fk_data.iloc[0]
-            
-            # Anzahl Direct Reports
-            direct_reports = len(df_stamm[df_stamm['FK_PersonalNr'] == fk_nr_int])
-            
-            tokens.append({
-                'Token': token,
-                'PersonalNr': fk_nr_int,
-                'Name': f"{fk_row['Vorname']} {fk_row['Nachname']}",
-                'Email': fk_row.get('Email', ''),
-                'Rolle': 'FK',
-                'Gueltig_bis': (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d'),
-                'Erstellt_am': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            print(f"✓ Token für {fk_row['Vorname']} {fk_row['Nachname']} ({direct_reports} MA)")
-    
-    # HR Master-Token
+
+    managers = load_managers(df_stamm)
+
+    print(f"📊 Gefunden: {len(managers)} Führungskräfte")
     print()
-    print("🏢 Erstelle HR Master-Token...")
-    
-    tokens.append({
-        'Token': f"HR_MASTER_{secrets.token_urlsafe(24)}",
-        'PersonalNr': 99999,
-        'Name': 'HR Team',
-        'Email': 'hr@zh.ch',
-        'Rolle': 'HR',
-        'Gueltig_bis': (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d'),
-        'Erstellt_am': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    })
-    
-    print("   ✓ HR Master-Token erstellt")
-    
-    # Als DataFrame speichern
-    df_tokens = pd.DataFrame(tokens)
-    df_tokens.to_csv(data_dir / "tokens.csv", index=False, encoding='utf-8-sig')
-    
+
+    if rotate_only and tokens_path.exists():
+        existing = pd.read_csv(tokens_path, encoding='utf-8-sig', dtype={'Token': str})
+        tokens, issued, removed = rotate(existing, managers, valid_days, renew_days, set(revoke))
+
+        kept = len(tokens) - len(issued)
+        print(f"✓ {kept} gültige Tokens behalten")
+        print(f"✓ {len(issued)} Tokens neu ausgestellt (neu, läuft in {renew_days} Tagen ab oder gesperrt)")
+        for record in removed:
+            print(f"🗑️  Token entfernt: {record['Name']} ({record['Rolle']}, keine FK mehr)")
+    else:
+        if rotate_only:
+            print("⚠️  Keine tokens.csv gefunden, erstelle alle Tokens neu")
+            print()
+        tokens = []
+
+        # Pro FK einen Token generieren
+        for personal_nr, row in managers.iterrows():
+            name = f"{row['Vorname']} {row['Nachname']}"
+            tokens.append(new_token(personal_nr, name, row.get('Email', ''), 'FK', valid_days))
+            print(f"✓ Token für {name} ({row['Direct_Reports']} MA)")
+
+        # HR Master-Token
+        print()
+        print("🏢 Erstelle HR Master-Token...")
+        tokens.append(new_token(HR_PERSONAL_NR, 'HR Team', 'hr@zh.ch', 'HR', valid_days))
+        print("   ✓ HR Master-Token erstellt")
+        issued = tokens
+
+    # Atomar speichern: der laufende Server lädt die Datei beim nächsten Zugriff neu
+    write_tokens(tokens_path, tokens)
+
     print()
     print("=" * 70)
     print("✅ TOKENS GENERIERT UND GESPEICHERT")
     print("=" * 70)
     print()
-    
-    # Übersicht für Email-Versand
+
+    # Übersicht für Email-Versand (nur neu ausgestellte Tokens)
     print("📧 TOKENS FÜR EMAIL-VERSAND")
     print("=" * 70)
     print()
-    
-    for _, row in df_tokens.iterrows():
+
+    for row in issued:
         print(f"👤 {row['Name']} ({row['Rolle']}):")
         print(f"   Link: http://10.96.134.42:5000?token={row['Token']}")
         print(f"   Gültig bis: {row['Gueltig_bis']}")
         print()
-    
+
+    if not issued:
+        print("   Keine neuen Tokens.")
+        print()
+
     print("=" * 70)
     print()
     print("💡 HINWEIS:")
     print("   Diese Links per Email an die Führungskräfte senden.")
     print("   Der Token im Link gewährt Zugriff auf die jeweiligen Gespräche.")
+    if os.environ.get('MAG_STORAGE', 'csv').strip().lower() == 'sqlite':
+        print("   SQLite-Betrieb: danach 'python migrate_to_sqlite.py tokens' ausführen.")
     print()
     print(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
 
 if __name__ == "__main__":
-    generate_tokens()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Zugangs-Tokens für Führungskräfte und HR erstellen")
+    parser.add_argument('--rotate', action='store_true',
+                        help="Gültige Tokens behalten, nur neue FKs sowie ablaufende/gesperrte Tokens neu ausstellen")
+    parser.add_argument('--renew-days', type=int, default=30,
+                        help="Tokens erneuern, die innerhalb so vieler Tage ablaufen (Standard 30)")
+    parser.add_argument('--revoke', type=int, nargs='*', default=[], metavar='PERSONALNR',
+                        help="Tokens dieser Personen sperren und neu ausstellen")
+    parser.add_argument('--valid-days', type=int, default=365,
+                        help="Gültigkeit neuer Tokens in Tagen (Standard 365)")
+    args = parser.parse_args()
+    generate_tokens(args.rotate or bool(args.revoke), args.valid_days, args.renew_days, args.revoke)
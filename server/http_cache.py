@@ -0,0 +1,81 @@
+## 📦 **HTTP-Caching und Kompression - http_cache.py**
+
+import gzip
+import hashlib
+from flask import request
+
+# Brotli ist optional (pip install brotli), sonst nur gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson'}
+
+# Suffixe für komprimierte Varianten derselben Ressource
+ENCODING_SUFFIXES = {'br': '-br', 'gzip': '-gz'}
+
+
+def make_etag(*parts):
+    """Starker ETag aus beliebigen Bestandteilen (z.B. Datenstand, Scope, Query)"""
+    raw = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag):
+    """True, wenn der Client diese Version (auch komprimiert) schon hat"""
+    candidates = request.if_none_match
+    if not candidates:
+        return False
+    if candidates.star_tag:
+        return True
+    return any(candidates.contains_weak(etag + suffix)
+               for suffix in ('', *ENCODING_SUFFIXES.values()))
+
+
+def cache_headers(response, etag):
+    """ETag setzen; private, weil Antworten vom Token abhängen"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.update(['Authorization', 'Accept'])
+    return response
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, min_bytes):
+    """JSON-Antworten ab min_bytes mit brotli oder gzip komprimieren"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=5)
+    else:
+        data = gzip.compress(data, compresslevel=6)
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+
+    # Komprimierte Variante bekommt eigenen ETag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + ENCODING_SUFFIXES[encoding], weak)
+    return response
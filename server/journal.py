@@ -0,0 +1,83 @@
+## 📒 **Änderungs-Journal - journal.py**
+
+import os
+import json
+from datetime import datetime
+
+
+class Journal:
+    """Append-only Journal mit Feldänderungen (eine JSON-Zeile pro Änderung).
+
+    Jeder Eintrag wird mit fsync geschrieben. Eine unvollständige letzte
+    Zeile (z.B. nach einem Absturz) wird beim Lesen ignoriert.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def stat(self):
+        """(Datei-ID, Grösse) oder (None, 0) falls kein Journal existiert"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (None, 0)
+        return (stat.st_ino, stat.st_size)
+
+    def append(self, key, fields):
+        """Änderung anhängen, gibt die neue Journal-Grösse zurück"""
+        return self.append_many([(key, fields)])
+
+    def append_many(self, changes):
+        """Mehrere Änderungen [(key, fields)] mit einem fsync anhängen"""
+        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        data = b''.join(
+            (json.dumps({'ts': ts, 'key': key, 'fields': fields}, ensure_ascii=False) + '\n').encode('utf-8')
+            for key, fields in changes
+        )
+        with open(self.path, 'a+b') as f:
+            # Abgebrochene Zeile eines früheren Absturzes abschliessen
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    data = b'\n' + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def read_from(self, offset):
+        """Einträge ab Byte-Offset lesen, gibt (Einträge, neuer Offset) zurück"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        # Nur vollständige Zeilen verarbeiten
+        end = data.rfind(b'\n') + 1
+        entries = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                print(f"⚠️  Ungültige Journal-Zeile übersprungen: {line[:80]!r}")
+        return entries, offset + end
+
+    def drop_prefix(self, offset):
+        """Alles vor offset verwerfen (atomar über temporäre Datei)"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,205 @@
+## 📋 **Gesprächslisten - listing.py**
+
+import json
+import base64
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from metrics import metrics
+
+# Grosse Freitext-Felder (in Listenansichten meist nicht nötig)
+TEXT_FIELDS = ['Ziele_2025', 'Entwicklung', 'Feedback']
+
+MAX_LIMIT = 500
+
+
+def _text(value):
+    return str(value).casefold()
+
+
+def _number(value):
+    return value if isinstance(value, int) else -1
+
+
+# Sortierbare Felder -> Sortierschlüssel
+SORT_FIELDS = {
+    'Gespraechs_ID': _number,
+    'MA_PersonalNr': _number,
+    'FK_PersonalNr': _number,
+    'Nachname': _text,
+    'Vorname': _text,
+    'Abteilung': _text,
+    'Status': _text,
+    'Datum': str,
+    'Geaendert_am': str
+}
+
+
+def encode_cursor(sort, key):
+    # Sortierung mitspeichern: ein Cursor passt nur zur Sortierung, aus der er stammt
+    raw = json.dumps([sort, *key], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor, sort):
+    """Cursor -> (Sortierwert, Gespraechs_ID), ValueError bei fremder Sortierung oder falschen Typen"""
+    try:
+        cursor_sort, value, gespraechs_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Ungültiger Cursor')
+    if cursor_sort != sort:
+        raise ValueError('Cursor gehört zu einer anderen Sortierung')
+    # Gleicher Typ wie der Sortierschlüssel, sonst scheitert der Vergleich in bisect
+    value_type = int if SORT_FIELDS[sort.lstrip('-')] is _number else str
+    if type(value) is not value_type or type(gespraechs_id) is not int:
+        raise ValueError('Ungültiger Cursor')
+    return (value, gespraechs_id)
+
+
+class ListQuery:
+    """Filter, Sortierung, Blättern und Feldauswahl aus den Query-Parametern.
+
+    status=Geplant,In Bearbeitung  abteilung=IT  fk=67890  name=mü
+    sort=-Datum  limit=50  cursor=...  fields=Gespraechs_ID,Status
+    """
+
+    def __init__(self, args):
+        status = args.get('status', '')
+        self.status = frozenset(s.strip() for s in status.split(',') if s.strip())
+        self.abteilung = args.get('abteilung', '').strip()
+        self.name = args.get('name', '').strip().casefold()
+
+        self.fk = None
+        if args.get('fk'):
+            try:
+                self.fk = int(args['fk'])
+            except ValueError:
+                raise ValueError('Parameter fk muss eine Personalnummer sein')
+
+        sort = args.get('sort', 'Gespraechs_ID')
+        self.descending = sort.startswith('-')
+        self.sort = sort.lstrip('-')
+        if self.sort not in SORT_FIELDS:
+            raise ValueError(f"Sortierung nach '{self.sort}' nicht möglich")
+
+        self.limit = None
+        if args.get('limit'):
+            try:
+                self.limit = int(args['limit'])
+            except ValueError:
+                raise ValueError('Parameter limit muss eine Zahl sein')
+            if not 1 <= self.limit <= MAX_LIMIT:
+                raise ValueError(f'Parameter limit muss zwischen 1 und {MAX_LIMIT} liegen')
+
+        self.cursor = decode_cursor(args['cursor'], sort) if args.get('cursor') else None
+
+        fields = args.get('fields', '')
+        self.fields = [f.strip() for f in fields.split(',') if f.strip()] or None
+
+    def is_unfiltered(self):
+        """Keine Filter, Standard-Sortierung und kein Blättern"""
+        return (not self.status and not self.abteilung and not self.name
+                and self.fk is None and self.sort == 'Gespraechs_ID'
+                and not self.descending and self.limit is None and self.cursor is None)
+
+    def cache_key(self):
+        """Alles, was Auswahl und Reihenfolge bestimmt (ohne Blättern)"""
+        return (self.status, self.abteilung, self.name, self.fk, self.sort)
+
+    def matches(self, row):
+        if self.status and row['Status'] not in self.status:
+            return False
+        if self.abteilung and row['Abteilung'] != self.abteilung:
+            return False
+        if self.fk is not None and row['FK_PersonalNr'] != self.fk:
+            return False
+        if self.name:
+            vorname = str(row['Vorname']).casefold()
+            nachname = str(row['Nachname']).casefold()
+            if not (vorname.startswith(self.name) or nachname.startswith(self.name)
+                    or f"{vorname} {nachname}".startswith(self.name)):
+                return False
+        return True
+
+    def sort_key(self, row):
+        return (SORT_FIELDS[self.sort](row[self.sort]), row['Gespraechs_ID'])
+
+
+def iter_joined(rows, employees):
+    """Gespräche einzeln mit Name und Abteilung der Mitarbeitenden ergänzen"""
+    by_nr = employees.current()
+    for gespraech in rows:
+        ma = by_nr.get(gespraech['MA_PersonalNr'])
+        if ma is None:
+            yield {**gespraech, 'PersonalNr': '', 'Nachname': '', 'Vorname': '', 'Abteilung': ''}
+            continue
+        yield {
+            **gespraech,
+            'PersonalNr': ma.personal_nr,
+            'Nachname': ma.nachname,
+            'Vorname': ma.vorname,
+            'Abteilung': ma.abteilung
+        }
+
+
+def join_mitarbeiter(rows, employees):
+    """Gespräche mit Name und Abteilung der Mitarbeitenden ergänzen"""
+    with metrics.span('join'):
+        return list(iter_joined(rows, employees))
+
+
+def build_listing(rows, query):
+    """Filtern und sortieren, gibt (Zeilen, Sortierschlüssel) zurück"""
+    rows = sorted((row for row in rows if query.matches(row)), key=query.sort_key)
+    return rows, [query.sort_key(row) for row in rows]
+
+
+def paginate(rows, keys, query):
+    """Eine Seite ab dem Cursor, gibt (Seite, nächster Cursor) zurück"""
+    if query.limit is None and query.cursor is None:
+        return (rows[::-1] if query.descending else rows), None
+
+    limit = query.limit or len(rows)
+    if not query.descending:
+        start = bisect_right(keys, query.cursor) if query.cursor else 0
+        end = min(start + limit, len(rows))
+        page = rows[start:end]
+        has_more = end < len(rows)
+    else:
+        end = bisect_left(keys, query.cursor) if query.cursor else len(rows)
+        start = max(end - limit, 0)
+        page = rows[start:end][::-1]
+        has_more = start > 0
+
+    next_cursor = None
+    if page and has_more:
+        next_cursor = encode_cursor(('-' if query.descending else '') + query.sort, query.sort_key(page[-1]))
+    return page, next_cursor
+
+
+def project(row, fields):
+    """Nur die angeforderten Felder übernehmen"""
+    if not fields:
+        return row
+    return {field: row[field] for field in fields if field in row}
+
+
+class ListingCache:
+    """Gefilterte, sortierte Listen pro Datenstand (LRU)"""
+
+    def __init__(self, size=32):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,39 @@
+## 🔒 **Datei-Locks - locking.py**
+
+import os
+import time
+from contextlib import contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def file_lock(path):
+    """Exklusiver, prozessübergreifender Lock über eine Lock-Datei.
+
+    Nicht reentrant: innerhalb desselben Prozesses zusätzlich einen
+    threading-Lock halten und nicht verschachteln.
+    """
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,221 @@
+## 📈 **Metriken und Profiling - metrics.py**
+
+import os
+import json
+import time
+import heapq
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from pathlib import Path
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Histogramm-Grenzen in Sekunden
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Beschreibung der Metriken für die Prometheus-Ausgabe
+HELP = {
+    'mag_request_seconds': 'Dauer der HTTP-Anfragen (bis die Antwort erzeugt ist)',
+    'mag_span_seconds': 'Dauer einzelner Abschnitte (CSV laden/schreiben, Join, JSON, PDF, Excel)'
+}
+
+# Eigene Werte höchstens so oft in die Datei des Prozesses schreiben
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+class Metrics:
+    """Histogramme im Speicher, für alle Worker-Prozesse zusammengeführt.
+
+    Jeder Prozess schreibt seine Werte regelmässig als metrics_<pid>.json
+    in directory; render() summiert alle Dateien. Ohne directory zählt
+    nur der eigene Prozess.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self._series = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def configure(self, directory):
+        """Gemeinsamen Ordner setzen und Dateien beendeter Prozesse entfernen"""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in self.directory.glob('metrics_*.json'):
+            pid = int(path.stem.split('_')[1])
+            if pid != os.getpid() and not _pid_alive(pid):
+                path.unlink(missing_ok=True)
+
+    def observe(self, name, seconds, **labels):
+        """Einen Messwert in das Histogramm name{labels} eintragen"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Zähler pro Bucket (plus +Inf), dann Summe
+                series = self._series[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            series[bisect_left(BUCKETS, seconds)] += 1
+            series[-1] += seconds
+        if self.directory is not None and time.monotonic() - self._last_flush > FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    @contextmanager
+    def span(self, name):
+        """Dauer eines Abschnitts messen: with metrics.span('csv_load'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('mag_span_seconds', time.perf_counter() - started, span=name)
+
+    def _snapshot(self):
+        with self._lock:
+            return [[name, list(labels), list(series)] for (name, labels), series in self._series.items()]
+
+    def flush(self):
+        """Eigene Werte atomar in die Datei des Prozesses schreiben"""
+        # Schreibt schon ein anderer Thread, reicht dessen Stand
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            path = self.directory / f"metrics_{os.getpid()}.json"
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"❌ Metriken konnten nicht gespeichert werden: {e}")
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """Werte aller Prozesse summiert: {(name, labels): [Bucket-Zähler..., Summe]}"""
+        snapshots = [self._snapshot()]
+        if self.directory is not None:
+            own = f"metrics_{os.getpid()}.json"
+            for path in self.directory.glob('metrics_*.json'):
+                if path.name == own:
+                    continue
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    # Prozess ist beendet oder schreibt gerade
+                    continue
+
+        merged = {}
+        for snapshot in snapshots:
+            for name, labels, series in snapshot:
+                key = (name, tuple(tuple(label) for label in labels))
+                total = merged.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return merged
+
+    def render(self):
+        """Alle Histogramme im Prometheus-Textformat"""
+        lines = []
+        by_name = {}
+        for (name, labels), series in sorted(self.collect().items()):
+            by_name.setdefault(name, []).append((labels, series))
+        for name, entries in by_name.items():
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, series in entries:
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), series[:-1]):
+                    cumulative += count
+                    le = _label_text(labels + (('le', bound),))
+                    lines.append(f"{name}_bucket{{{le}}} {cumulative}")
+                text = _label_text(labels)
+                lines.append(f"{name}_sum{{{text}}} {series[-1]:.6f}")
+                lines.append(f"{name}_count{{{text}}} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # Unter Windows läuft nur ein Server-Prozess (waitress)
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SlowRequestProfiler:
+    """Stichprobe von Anfragen mit cProfile messen, die langsamsten behalten.
+
+    Pro Prozess wird höchstens eine Anfrage gleichzeitig profiliert. Die
+    keep langsamsten landen als Textauswertung (und .prof für snakeviz
+    o.ä.) in directory, schnellere werden wieder gelöscht.
+    """
+
+    def __init__(self, directory, sample_rate, keep=20):
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._slowest = []
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def start(self):
+        """Profiler für diese Anfrage oder None (nicht in der Stichprobe)"""
+        with self._lock:
+            self._counter += 1
+            sampled = self._counter * self.sample_rate >= 1
+            if sampled:
+                self._counter = 0
+        if not sampled or not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Anderes Profiling-Werkzeug aktiv
+            self._busy.release()
+            return None
+        return profiler
+
+    def stop(self, profiler, seconds, description):
+        """Profiler beenden und Auswertung speichern, falls unter den langsamsten"""
+        profiler.disable()
+        self._busy.release()
+
+        with self._lock:
+            if len(self._slowest) >= self.keep and seconds <= self._slowest[0][0]:
+                return
+            stem = f"{seconds * 1000:08.1f}ms_{os.getpid()}_{int(time.time() * 1000)}"
+            heapq.heappush(self._slowest, (seconds, stem))
+            evicted = heapq.heappop(self._slowest) if len(self._slowest) > self.keep else None
+
+        if evicted is not None:
+            for suffix in ('.txt', '.prof'):
+                (self.directory / f"{evicted[1]}{suffix}").unlink(missing_ok=True)
+
+        out = StringIO()
+        out.write(f"{description}\nDauer: {seconds * 1000:.1f} ms\n\n")
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(40)
+        (self.directory / f"{stem}.txt").write_text(out.getvalue(), encoding='utf-8')
+        profiler.dump_stats(str(self.directory / f"{stem}.prof"))
+
+
+# Gemeinsame Instanz für alle Module (app.py setzt den Ordner)
+metrics = Metrics()
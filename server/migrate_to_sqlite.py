@@ -0,0 +1,84 @@
+## 🗃️ **CSV → SQLite Migration - migrate_to_sqlite.py**
+
+import sys
+import pandas as pd
+from datetime import datetime
+from config import DATA_DIR, SQLITE_PATH
+from datastore import DataStore
+from sqlite_store import connect, create_table, bump_version, INTEGER_COLUMNS
+from token_index import hash_token
+
+
+def load_csv(name):
+    """CSV laden und für SQLite aufbereiten (NaN -> NULL, Ganzzahlen als int)"""
+    df = pd.read_csv(DATA_DIR / f"{name}.csv", encoding='utf-8-sig', dtype={'Token': str})
+
+    if name == 'tokens':
+        # Nur den Hash speichern, nie den Klartext-Token
+        df.insert(0, 'Token_Hash', df['Token'].map(hash_token))
+        df = df.drop(columns=['Token'])
+
+    columns = list(df.columns)
+    rows = []
+    for record in df.to_dict('records'):
+        row = []
+        for column in columns:
+            value = record[column]
+            if pd.isna(value):
+                value = None
+            elif column in INTEGER_COLUMNS:
+                value = int(value)
+            row.append(value)
+        rows.append(row)
+    return columns, rows
+
+
+def migrate(tables=('stammdaten', 'gespraeche', 'tokens')):
+    """Importiert die CSV-Dateien in die SQLite-Datenbank (ersetzt bestehende Tabellen)"""
+
+    print("=" * 70)
+    print("🗃️  CSV → SQLITE MIGRATION")
+    print("=" * 70)
+    print()
+    print(f"📁 Datenbank: {SQLITE_PATH.absolute()}")
+    print()
+
+    # Offene Journal-Einträge zuerst in gespraeche.csv übernehmen
+    if 'gespraeche' in tables:
+        DataStore(DATA_DIR).gespraeche.compact()
+
+    conn = connect(SQLITE_PATH)
+
+    for table in tables:
+        print(f"📥 Importiere {table}.csv...")
+        columns, rows = load_csv(table)
+
+        placeholders = ', '.join('?' for _ in columns)
+        with conn:
+            conn.execute('BEGIN')
+            create_table(conn, table, columns)
+            conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+            bump_version(conn, new_epoch=True)
+
+        print(f"   ✓ {len(rows)} Zeilen importiert")
+
+    conn.execute('PRAGMA optimize')
+    conn.close()
+
+    print()
+    print("=" * 70)
+    print("✅ MIGRATION ABGESCHLOSSEN")
+    print("=" * 70)
+    print()
+    print("💡 Server mit SQLite starten: MAG_STORAGE=sqlite python app.py")
+    print()
+    print(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+
+
+if __name__ == "__main__":
+    # Optional nur einzelne Tabellen, z.B. nach generate_tokens.py:
+    #   python migrate_to_sqlite.py tokens
+    if len(sys.argv) > 1:
+        migrate(sys.argv[1:])
+    else:
+        migrate()
@@ -0,0 +1,94 @@
+## 🗂️ **PDF-Cache - pdf_cache.py**
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pdf_render import TEMPLATE_VERSION
+
+# Felder, die sich ändern, ohne dass sich das PDF ändert
+IGNORED_FIELDS = {'PDF_Pfad', 'Geaendert_am', 'Erstellt_am'}
+
+
+class PdfCache:
+    """PDFs nach Hash ihrer Eingaben ablegen und wiederverwenden.
+
+    Der Dateiname enthält den Hash aus Gespräch, MA-/FK-Stammdaten und
+    Template-Version. Als Zeitpunkt der letzten Nutzung dient die
+    Zugriffszeit (atime), die bei jedem Treffer und Download explizit
+    gesetzt wird. Übersteigt das Verzeichnis max_bytes, werden die am
+    längsten nicht genutzten PDFs gelöscht.
+    """
+
+    def __init__(self, pdf_dir, max_bytes, evict_interval=60):
+        self.pdf_dir = pdf_dir
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._last_evict = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(gespraech, ma, fk, year):
+        """Hash aller Eingaben, die das PDF beeinflussen"""
+        inputs = {
+            'template': TEMPLATE_VERSION,
+            'year': year,
+            'gespraech': {k: v for k, v in gespraech.items() if k not in IGNORED_FIELDS},
+            'ma': ma,
+            'fk': fk
+        }
+        raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def filename(self, gespraech, ma, fk, year):
+        """Dateiname, z.B. MAG_12345_3f2a….pdf"""
+        return f"MAG_{int(gespraech['MA_PersonalNr'])}_{self.key(gespraech, ma, fk, year)[:24]}.pdf"
+
+    def lookup(self, filename):
+        """Pfad zum vorhandenen PDF (als genutzt markiert) oder None"""
+        path = self.pdf_dir / filename
+        if not path.is_file():
+            return None
+        self.touch(path)
+        return path
+
+    def touch(self, path):
+        """Zugriffszeit setzen, Änderungszeit unverändert lassen (ETag bleibt stabil)"""
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except OSError:
+            pass
+
+    def evict(self, force=False):
+        """Am längsten nicht genutzte PDFs löschen, bis max_bytes eingehalten ist"""
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_evict < self.evict_interval:
+                return 0
+            self._last_evict = now
+
+        files = []
+        total = 0
+        for path in self.pdf_dir.glob('*.pdf'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+
+        if removed:
+            print(f"🧹 PDF-Cache: {removed} alte PDFs entfernt")
+        return removed
@@ -0,0 +1,179 @@
+## ⏳ **PDF-Warteschlange - pdf_jobs.py**
+
+import os
+import re
+import json
+import time
+import secrets
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pdf_render import render_pdf
+from metrics import metrics
+
+JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16}$')
+
+# Status-Dateien fertiger Aufträge so lange aufbewahren
+JOB_RETENTION_SECONDS = 24 * 3600
+
+
+class QueueFullError(Exception):
+    """Zu viele offene PDF-Aufträge"""
+
+
+def save_job(job_dir, job):
+    """Status-Datei atomar schreiben"""
+    job['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    path = job_dir / f"{job['job_id']}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _render_job(job_dir, job, filepath, gespraech, ma, fk, year):
+    # Läuft im Pool-Prozess, gibt die Renderdauer zurück (Metriken zählt der Server-Prozess)
+    job['status'] = 'running'
+    save_job(job_dir, job)
+    # Erst unter temporärem Namen schreiben, damit nie ein halbes PDF ausgeliefert wird
+    tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
+    try:
+        started = time.perf_counter()
+        render_pdf(str(tmp_path), gespraech, ma, fk, year)
+        os.replace(tmp_path, filepath)
+        return time.perf_counter() - started
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class PdfJobQueue:
+    """PDF-Aufträge in einem begrenzten Prozess-Pool rendern.
+
+    Der Status jedes Auftrags liegt als JSON-Datei in job_dir, damit
+    jeder Worker-Prozess ihn beantworten kann. Nach dem Rendern ruft
+    on_done(job) im Server-Prozess auf (z.B. um PDF_Pfad zu speichern).
+    """
+
+    def __init__(self, job_dir, pdf_dir, max_workers=2, max_pending=100, on_done=None):
+        self.job_dir = job_dir
+        self.pdf_dir = pdf_dir
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.on_done = on_done
+        self._executor = None
+        self._pending = 0
+        self._submitted = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+
+    def _new_executor(self):
+        # 'spawn' statt fork: der Server-Prozess läuft mit mehreren Threads
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def _get_executor(self):
+        # Erst beim ersten Auftrag starten (nach dem Fork der Web-Worker)
+        if self._executor is None:
+            self._executor = self._new_executor()
+        return self._executor
+
+    def _job_path(self, job_id):
+        return self.job_dir / f"{job_id}.json"
+
+    def get(self, job_id):
+        """Auftrag laden oder None"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self._job_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def submit(self, gespraech, ma, fk, year, filename, owner, archived=False):
+        """Auftrag einreihen, gibt den Auftrag (Status 'queued') zurück.
+
+        Läuft für dieselbe Datei schon ein Auftrag, wird dieser zurückgegeben.
+        year: Jahr des Gesprächs; archived: stammt aus dem Archiv dieses Jahres
+        """
+        job = {
+            'job_id': secrets.token_urlsafe(12),
+            'status': 'queued',
+            'gespraechs_id': int(gespraech['Gespraechs_ID']),
+            'filename': filename,
+            'owner': owner,
+            'year': year,
+            'archived': archived,
+            'error': None,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        with self._lock:
+            active = self._active.get(filename)
+            if active is None:
+                if self._pending >= self.max_pending:
+                    raise QueueFullError('Zu viele PDF-Aufträge, bitte später erneut versuchen')
+                self._pending += 1
+                self._submitted += 1
+                self._active[filename] = job
+                cleanup = self._submitted % 100 == 1
+        if active is not None:
+            return self.get(active['job_id']) or dict(active)
+
+        save_job(self.job_dir, job)
+
+        filepath = self.pdf_dir / filename
+        try:
+            future = self._submit_render(self.job_dir, dict(job), filepath, gespraech, ma, fk, year)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._active.pop(filename, None)
+            raise
+        future.add_done_callback(lambda f: self._finish(job, f))
+
+        if cleanup:
+            self.cleanup()
+        return job
+
+    def _submit_render(self, *args):
+        with self._lock:
+            try:
+                return self._get_executor().submit(_render_job, *args)
+            except BrokenProcessPool:
+                # Abgestürzten Pool ersetzen
+                self._executor = self._new_executor()
+                return self._executor.submit(_render_job, *args)
+
+    def _finish(self, job, future):
+        try:
+            metrics.observe('mag_span_seconds', future.result(), span='pdf_render')
+            job['status'] = 'done'
+            if self.on_done is not None:
+                self.on_done(job)
+            print(f"✅ PDF generiert: {job['filename']}")
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e) or e.__class__.__name__
+            print(f"❌ PDF-Fehler (Auftrag {job['job_id']}): {job['error']}")
+        finally:
+            save_job(self.job_dir, job)
+            with self._lock:
+                self._pending -= 1
+                self._active.pop(job['filename'], None)
+
+    def cleanup(self):
+        """Alte Status-Dateien entfernen"""
+        limit = time.time() - JOB_RETENTION_SECONDS
+        for path in self.job_dir.glob('*.json'):
+            try:
+                if path.stat().st_mtime < limit:
+                    path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,156 @@
+## 📄 **PDF-Erstellung - pdf_render.py**
+
+from io import BytesIO
+from datetime import datetime
+from text_layout import wrap_lines, draw_lines
+
+# ReportLab erst beim ersten PDF laden (Start und Speicher der Web-Worker);
+# Masse wie reportlab.lib.units und reportlab.lib.pagesizes.A4
+cm = 72 / 2.54
+mm = cm * 0.1
+A4 = (210*mm, 297*mm)
+
+# Bei jeder Änderung am Layout erhöhen (Teil des Schlüssels im PDF-Cache)
+TEMPLATE_VERSION = 3
+
+# Freitext-Abschnitte: Feld, Überschrift ({year} = Jahr des Gesprächs), Text wenn leer
+SECTIONS = [
+    ('Ziele_2025', 'Ziele {year}:', 'Noch keine Ziele erfasst'),
+    ('Entwicklung', 'Entwicklungsfelder:', 'Keine Angaben'),
+    ('Feedback', 'Feedback:', 'Keine Angaben')
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+TEXT_FONT = 'Helvetica'
+TEXT_SIZE = 10
+TEXT_LEADING = 0.5*cm
+TEXT_WIDTH = PAGE_WIDTH - 4.5*cm
+PAGE_TOP = PAGE_HEIGHT - 3*cm
+PAGE_BOTTOM = 3*cm
+
+
+def _person_name(person, personal_nr):
+    """Anzeigename oder Hinweis, falls nicht in den Stammdaten"""
+    if not person:
+        return f"Unbekannt (Personalnummer {personal_nr})"
+    return f"{person['Vorname']} {person['Nachname']}"
+
+
+def _draw_section(c, y, title, text, placeholder):
+    """Überschrift und umbrochenen Text zeichnen, gibt das neue y zurück"""
+    text = str(text).strip()
+    if not text or text == 'nan':
+        text = placeholder
+    
+    # Überschrift nicht allein am Seitenende stehen lassen
+    y -= 1*cm
+    if y < PAGE_BOTTOM + 2*cm:
+        c.showPage()
+        y = PAGE_TOP
+    
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2*cm, y, title)
+    y -= 0.6*cm
+    
+    lines = wrap_lines(text, TEXT_FONT, TEXT_SIZE, TEXT_WIDTH)
+    return draw_lines(c, lines, 2.5*cm, y, TEXT_FONT, TEXT_SIZE, TEXT_LEADING, PAGE_BOTTOM, PAGE_TOP)
+
+
+def render_pdf(filepath, gespraech, ma, fk, year):
+    """Gesprächsprotokoll als PDF schreiben.
+
+    Bekommt nur einfache Dicts, damit die Funktion auch in einem
+    separaten Prozess laufen kann. ma/fk sind None, wenn die Person
+    nicht in den Stammdaten steht.
+    """
+    from reportlab.pdfgen import canvas
+
+    ma_name = _person_name(ma, gespraech.get('MA_PersonalNr', ''))
+    fk_name = _person_name(fk, gespraech.get('FK_PersonalNr', ''))
+    
+    # Dateipfad oder file-like Objekt
+    target = filepath if hasattr(filepath, 'write') else str(filepath)
+    c = canvas.Canvas(target, pagesize=A4)
+    width, height = A4
+    
+    # Kanton ZH Blau: RGB(0, 158, 224)
+    zh_blue = (0/255, 158/255, 224/255)
+    
+    # Header (blaue Box)
+    c.setFillColorRGB(*zh_blue)
+    c.rect(0, height - 3*cm, width, 3*cm, fill=True, stroke=False)
+    
+    c.setFillColorRGB(1, 1, 1)  # Weiss
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(2*cm, height - 2*cm, f"Mitarbeitergespräch {year}")
+    
+    c.setFontSize(10)
+    c.drawString(2*cm, height - 2.6*cm, "Kanton Zürich")
+    
+    # Content
+    c.setFillColorRGB(0, 0, 0)  # Schwarz
+    y = height - 5*cm
+    
+    # Mitarbeitende
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2*cm, y, "Mitarbeitende:")
+    c.setFont("Helvetica", 11)
+    y -= 0.6*cm
+    c.drawString(2*cm, y, ma_name)
+    y -= 0.5*cm
+    c.drawString(2*cm, y, f"Personalnummer: {gespraech.get('MA_PersonalNr', '')}")
+    y -= 0.5*cm
+    c.drawString(2*cm, y, f"Abteilung: {ma['Abteilung'] if ma else '-'}")
+    
+    # Führungskraft
+    y -= 1.5*cm
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2*cm, y, "Führungskraft:")
+    c.setFont("Helvetica", 11)
+    y -= 0.6*cm
+    c.drawString(2*cm, y, fk_name)
+    
+    # Datum
+    y -= 1.5*cm
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2*cm, y, "Datum:")
+    c.setFont("Helvetica", 11)
+    y -= 0.6*cm
+    datum_str = str(gespraech.get('Datum', ''))
+    c.drawString(2*cm, y, datum_str if datum_str else 'Noch nicht festgelegt')
+    
+    # Freitexte (beliebig lang, Umbruch auf Folgeseiten)
+    for field, title, placeholder in SECTIONS:
+        y = _draw_section(c, y, title.format(year=year), gespraech.get(field, ''), placeholder)
+    
+    # Unterschriften (neue Seite)
+    c.showPage()
+    y = 8*cm
+    
+    c.setFont("Helvetica", 10)
+    c.line(2*cm, y, 8*cm, y)
+    c.line(12*cm, y, 18*cm, y)
+    
+    y -= 0.6*cm
+    c.drawString(2*cm, y, ma_name)
+    c.drawString(12*cm, y, fk_name)
+    
+    y -= 0.4*cm
+    c.setFontSize(9)
+    c.setFillColorRGB(0.4, 0.4, 0.4)
+    c.drawString(2*cm, y, "Mitarbeitende")
+    c.drawString(12*cm, y, "Führungskraft")
+    
+    # Footer
+    y = 2*cm
+    c.setFontSize(8)
+    c.drawString(2*cm, y, f"Erstellt am: {datetime.now().strftime('%d.%m.%Y um %H:%M Uhr')}")
+    
+    c.save()
+
+
+def render_pdf_bytes(gespraech, ma, fk, year):
+    """PDF im Speicher erstellen und als Bytes zurückgeben"""
+    buffer = BytesIO()
+    render_pdf(buffer, gespraech, ma, fk, year)
+    return buffer.getvalue()
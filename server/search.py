@@ -0,0 +1,196 @@
+## 🔍 **Volltextsuche - search.py**
+
+import re
+import math
+import heapq
+import threading
+import unicodedata
+from collections import Counter
+from bisect import bisect_left
+
+# Durchsuchte Freitext-Felder
+SEARCH_FIELDS = ['Ziele_2025', 'Entwicklung', 'Feedback']
+
+MAX_LIMIT = 100
+
+# Suchbegriffe ab dieser Länge finden auch Wortanfänge (z.B. Führung -> Führungskompetenzen)
+PREFIX_MIN_LENGTH = 3
+PREFIX_MAX_TERMS = 50
+PREFIX_WEIGHT = 0.7
+
+# BM25-Parameter
+K1 = 1.2
+B = 0.75
+
+WORD = re.compile(r'\w+')
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue'})
+
+
+def fold(text):
+    """Kleinschreibung und Umlaute falten: Führung -> fuehrung, Straße -> strasse"""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFC', text).casefold().translate(_UMLAUTS)
+    if text.isascii():
+        return text
+    # Übrige Akzente entfernen (é -> e)
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Gefaltete Wörter eines Textes"""
+    return WORD.findall(fold(text))
+
+
+def _matches(word, query_terms):
+    return any(word == term or (len(term) >= PREFIX_MIN_LENGTH and word.startswith(term))
+               for term in query_terms)
+
+
+def make_snippet(gespraech, query_terms, width=120):
+    """Feld mit den meisten Treffern und Textausschnitt um den ersten Treffer"""
+    best = None
+    for field in SEARCH_FIELDS:
+        text = str(gespraech.get(field, ''))
+        positions = [m.start() for m in WORD.finditer(text) if _matches(fold(m.group()), query_terms)]
+        if positions and (best is None or len(positions) > best[0]):
+            best = (len(positions), field, text, positions[0])
+    if best is None:
+        return None, ''
+
+    _, field, text, position = best
+    start = max(0, position - width // 3)
+    if start > 0:
+        # Nicht mitten im Wort beginnen
+        space = max(text.rfind(' ', 0, start), text.rfind('\n', 0, start))
+        start = space + 1 if space >= 0 else start
+    end = min(len(text), start + width)
+    if end < len(text):
+        space = max(text.rfind(' ', start, end), text.rfind('\n', start, end))
+        end = space if space > position else end
+    snippet = ' '.join(text[start:end].split())
+    return field, ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+class SearchIndex:
+    """Invertierter Index über die Freitext-Felder der Gespräche.
+
+    Wird wie StatsIndex bei jeder Suche mit den seit dem letzten Mal
+    geänderten Gesprächen nachgeführt. Pro Gespräch wird auch die FK
+    gespeichert, damit Führungskräfte nur eigene Treffer sehen.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._token = None
+        self._postings = {}
+        self._docs = {}
+        self._total_length = 0
+        self._sorted_terms = None
+        self._lock = threading.Lock()
+
+    def _add(self, gespraech):
+        gespraechs_id = int(gespraech['Gespraechs_ID'])
+        counts = Counter()
+        for field in SEARCH_FIELDS:
+            counts.update(tokenize(gespraech.get(field, '')))
+        length = sum(counts.values())
+        self._docs[gespraechs_id] = (counts, length, gespraech['FK_PersonalNr'])
+        self._total_length += length
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_terms = None
+            postings[gespraechs_id] = tf
+
+    def _remove(self, gespraechs_id):
+        doc = self._docs.pop(gespraechs_id, None)
+        if doc is None:
+            return
+        counts, length, _ = doc
+        self._total_length -= length
+        for term in counts:
+            postings = self._postings[term]
+            del postings[gespraechs_id]
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+
+    def refresh(self):
+        """Index auf den aktuellen Datenstand bringen"""
+        with self._lock:
+            token, changed = self.store.changes_since(self._token)
+            if changed is None:
+                self._postings.clear()
+                self._docs.clear()
+                self._total_length = 0
+                self._sorted_terms = None
+                for gespraech in self.store.list_gespraeche():
+                    self._add(gespraech)
+            else:
+                for gespraechs_id in changed:
+                    self._remove(gespraechs_id)
+                    gespraech = self.store.get_gespraech(gespraechs_id)
+                    if gespraech is not None:
+                        self._add(gespraech)
+            self._token = token
+
+    def _expand(self, term):
+        # Exakter Begriff plus Wörter, die damit beginnen (schwächer gewichtet)
+        expansions = []
+        if term in self._postings:
+            expansions.append((term, 1.0))
+        if len(term) >= PREFIX_MIN_LENGTH:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            i = bisect_left(self._sorted_terms, term)
+            while (i < len(self._sorted_terms) and self._sorted_terms[i].startswith(term)
+                   and len(expansions) < PREFIX_MAX_TERMS):
+                if self._sorted_terms[i] != term:
+                    expansions.append((self._sorted_terms[i], PREFIX_WEIGHT))
+                i += 1
+        return expansions
+
+    def search(self, query, fk_personal_nr=None, limit=20):
+        """Gespräche, die alle Suchbegriffe enthalten, nach Relevanz (BM25).
+
+        fk_personal_nr: nur Gespräche dieser Führungskraft (oder Menge von FKs).
+        Gibt (Anzahl Treffer, [(Gespraechs_ID, Score)], Suchbegriffe) zurück.
+        """
+        if fk_personal_nr is not None and not isinstance(fk_personal_nr, (set, frozenset)):
+            fk_personal_nr = {fk_personal_nr}
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return 0, [], query_terms
+
+        self.refresh()
+        with self._lock:
+            n_docs = len(self._docs) or 1
+            avg_length = (self._total_length / n_docs) or 1
+            scores = None
+            for query_term in query_terms:
+                term_scores = {}
+                for term, weight in self._expand(query_term):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for gespraechs_id, tf in postings.items():
+                        if scores is not None and gespraechs_id not in scores:
+                            continue
+                        _, length, fk = self._docs[gespraechs_id]
+                        if fk_personal_nr is not None and fk not in fk_personal_nr:
+                            continue
+                        score = weight * idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+                        if score > term_scores.get(gespraechs_id, 0):
+                            term_scores[gespraechs_id] = score
+                # Alle Begriffe müssen vorkommen
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: scores[doc] + score for doc, score in term_scores.items()}
+                if not scores:
+                    break
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), ranked, query_terms
@@ -0,0 +1,70 @@
+## 🏭 **Produktions-Server - serve.py**
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mitarbeitergespräche im Produktionsmodus starten")
+    parser.add_argument('--host', default=os.environ.get('MAG_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('MAG_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('MAG_WORKERS', os.cpu_count() or 1)),
+                        help="Anzahl Prozesse (nur gunicorn)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('MAG_THREADS', 4)),
+                        help="Threads pro Prozess")
+    parser.add_argument('--server', choices=['gunicorn', 'waitress'],
+                        default='waitress' if sys.platform == 'win32' else 'gunicorn')
+    return parser.parse_args()
+
+
+def run_gunicorn(args):
+    """Mehrere Prozesse mit gunicorn (nur Linux/macOS)"""
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{args.host}:{args.port}")
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('threads', args.threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', 120)
+
+        def load(self):
+            from app import app
+            return app
+
+    StandaloneApplication().run()
+
+
+def run_waitress(args):
+    """Ein Prozess mit Thread-Pool (läuft auch unter Windows)"""
+    from waitress import serve
+    from app import app
+
+    serve(app, host=args.host, port=args.port, threads=args.workers * args.threads)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    # Threads pro Prozess für config.py (Grenze der Event-Streams), vor dem Import von app
+    os.environ['MAG_THREADS'] = str(args.threads if args.server == 'gunicorn' else args.workers * args.threads)
+
+    print("\n" + "=" * 70)
+    print("🏭 MITARBEITERGESPRÄCHE SERVER (PRODUKTION)")
+    print("=" * 70)
+    print(f"⚙️  Server: {args.server}")
+    if args.server == 'gunicorn':
+        print(f"👷 Prozesse: {args.workers} × {args.threads} Threads")
+    else:
+        print(f"👷 Threads: {args.workers * args.threads}")
+    print(f"🌐 Adresse: http://{args.host}:{args.port}")
+    print(f"📅 Gestartet: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+    print("=" * 70)
+    print()
+
+    if args.server == 'gunicorn':
+        run_gunicorn(args)
+    else:
+        run_waitress(args)
@@ -1,15 +1,51 @@
 ## 📊 **CSV-Strukturen erstellen - setup_data.py**
 
+import argparse
+import base64
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from config import DATA_DIR
+from generate_tokens import HR_PERSONAL_NR, TOKEN_COLUMNS, write_tokens
+
+# Bausteine für synthetische Daten (--employees)
+VORNAMEN = ['Anna', 'Peter', 'Sarah', 'Thomas', 'Lisa', 'Daniel', 'Laura', 'Marco', 'Sandra', 'Lukas',
+            'Nina', 'Stefan', 'Julia', 'Reto', 'Céline', 'Jürg', 'Andrea', 'Martin', 'Simone', 'Fabian']
+NACHNAMEN = ['Müller', 'Schmidt', 'Weber', 'Fischer', 'Meyer', 'Keller', 'Huber', 'Brunner', 'Gerber',
+             'Baumann', 'Frei', 'Zimmermann', 'Moser', 'Graf', 'Wyss', 'Steiner', 'Bühler', 'Schneider']
+ABTEILUNGEN = ['IT', 'HR', 'Finanzen', 'Recht', 'Bau', 'Gesundheit', 'Bildung', 'Sicherheit', 'Umwelt', 'Kultur']
+STATUS_WERTE = ['Geplant', 'In Bearbeitung', 'Abgeschlossen']
+STATUS_ANTEILE = [0.35, 0.35, 0.30]
+
+SAETZE = {
+    'Ziele_2025': [
+        'Projekt {} erfolgreich abschliessen.', 'Team im Bereich {} aufbauen.',
+        'Prozesse rund um {} vereinfachen.', 'Kundenzufriedenheit bei {} steigern.',
+        'Digitalisierung von {} vorantreiben.', 'Budgetverantwortung für {} übernehmen.'
+    ],
+    'Entwicklung': [
+        'Führungskompetenzen stärken, insbesondere bei {}.', 'Weiterbildung im Thema {} besuchen.',
+        'Mehr Verantwortung im Projekt {} übernehmen.', 'Präsentationstechnik anhand von {} üben.',
+        'Fachwissen zu {} vertiefen.', 'Coaching zur Zusammenarbeit mit {} nutzen.'
+    ],
+    'Feedback': [
+        'Sehr gute Teamarbeit im Projekt {}.', 'Zuverlässige Umsetzung bei {}.',
+        'Kommunikation mit {} kann verbessert werden.', 'Hohe Eigeninitiative beim Thema {}.',
+        'Termine bei {} wurden konsequent eingehalten.', 'Wertvolle Unterstützung für das Team {}.'
+    ]
+}
+THEMEN = ['Datenplattform', 'Personalplanung', 'Budget 2025', 'Kundenportal', 'Archivierung',
+          'Beschaffung', 'Schulung', 'Qualitätssicherung', 'Reporting', 'Onboarding']
+TEXT_VARIANTEN = 512
 
 def create_initial_data():
     """Erstellt initiale CSV-Dateien mit Beispieldaten"""
     
     # Relativer Pfad zum data-Ordner
-    data_dir = Path(__file__).parent.parent / "data"
-    data_dir.mkdir(exist_ok=True)
+    # Gleicher data-Ordner wie der Server (MAG_DATA_DIR)
+    data_dir = DATA_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
     
     pdf_dir = data_dir / "pdf_export"
     pdf_dir.mkdir(exist_ok=True)
@@ -116,5 +152,176 @@ def create_initial_data():
     print()
     print(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
 
+def _branching(n_employees, depth):
+    # Führungsspanne b mit 1 + b + b² + ... + b^(depth-1) ≈ n_employees
+    low, high = 1.0, float(n_employees)
+    for _ in range(60):
+        b = (low + high) / 2
+        if sum(b ** level for level in range(depth)) < n_employees:
+            low = b
+        else:
+            high = b
+    return high
+
+
+def _text_pool(rng, field):
+    # Mehrere Absätze aus Sätzen und Themen; die Gespräche wählen daraus per Index
+    saetze = np.array(SAETZE[field], dtype=object)
+    themen = np.array(THEMEN, dtype=object)
+    pool = []
+    for _ in range(TEXT_VARIANTEN):
+        absaetze = []
+        for _ in range(rng.integers(2, 5)):
+            n = rng.integers(1, 4)
+            vorlagen = rng.choice(saetze, n, replace=False)
+            absaetze.append(' '.join(v.format(t) for v, t in zip(vorlagen, rng.choice(themen, n))))
+        pool.append('\n'.join(absaetze))
+    return np.array(pool, dtype=object)
+
+
+def _timestamps(start, seconds):
+    return (pd.Timestamp(start) + pd.to_timedelta(seconds, unit='s')).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def generate_dataset(n_employees, depth=6, seed=42, force=False, data_dir=None, replace_tokens=False):
+    """Erzeugt synthetische Stammdaten, Gespräche und Tokens (Last- und Skalierungstests).
+
+    Gleicher Seed ergibt dieselben Daten. Alles wird spaltenweise mit numpy
+    erzeugt, auch eine Million Zeilen dauern nur Sekunden. Eine bestehende
+    tokens.csv wird nur mit replace_tokens ersetzt (die neuen Tokens sind aus dem Seed berechenbar).
+    """
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / "pdf_export").mkdir(exist_ok=True)
+
+    print("=" * 70)
+    print("📊 TESTDATEN-GENERATOR")
+    print("=" * 70)
+    print()
+
+    paths = [data_dir / name for name in ('stammdaten.csv', 'gespraeche.csv', 'tokens.csv')]
+    if not force and any(path.exists() for path in paths):
+        print("❌ Daten existieren bereits, zum Überschreiben --force angeben")
+        return
+    if (data_dir / "tokens.csv").exists() and not replace_tokens:
+        print(f"❌ {data_dir / 'tokens.csv'} existiert bereits und würde durch Tokens ersetzt,")
+        print("   die aus dem Seed berechenbar sind. Nur für Testdaten mit --replace-tokens erlauben.")
+        return
+
+    rng = np.random.default_rng(seed)
+    depth = max(1, min(depth, n_employees))
+    started = datetime.now()
+
+    # 1. Hierarchie: Ebene 0 ist die Direktion, jede Person hängt an einer
+    #    zufälligen Person der Ebene darüber
+    b = _branching(n_employees, depth)
+    sizes = np.maximum(1, np.round(b ** np.arange(depth)).astype(np.int64))
+    sizes[-1] = max(1, n_employees - sizes[:-1].sum())
+    sizes = sizes[np.cumsum(sizes) - sizes < n_employees]
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    n_employees = int(offsets[-1])
+
+    parent = np.full(n_employees, -1, dtype=np.int64)
+    abteilung = np.zeros(n_employees, dtype=np.int64)
+    if len(sizes) > 1:
+        # Jede Person auf Ebene 1 leitet eine Abteilung, die Unterstellten erben sie
+        abteilung[offsets[1]:offsets[2]] = np.arange(sizes[1]) % len(ABTEILUNGEN)
+    for level in range(1, len(sizes)):
+        start, end = offsets[level], offsets[level + 1]
+        parent[start:end] = offsets[level - 1] + rng.integers(0, sizes[level - 1], end - start)
+        if level > 1:
+            abteilung[start:end] = abteilung[parent[start:end]]
+
+    personal_nr = 100000 + rng.permutation(n_employees)
+    fk_nr = np.where(parent >= 0, personal_nr[np.maximum(parent, 0)], -1)
+
+    vorname = rng.integers(0, len(VORNAMEN), n_employees)
+    nachname = rng.integers(0, len(NACHNAMEN), n_employees)
+    vornamen = pd.Series(VORNAMEN)
+    nachnamen = pd.Series(NACHNAMEN)
+    email_teil = lambda namen: namen.str.lower().str.replace('ü', 'ue').str.replace('é', 'e')
+
+    df_stamm = pd.DataFrame({
+        'PersonalNr': personal_nr,
+        'Nachname': nachnamen.values[nachname],
+        'Vorname': vornamen.values[vorname],
+        'Email': (email_teil(vornamen).values[vorname] + '.' + email_teil(nachnamen).values[nachname]
+                  + '.' + personal_nr.astype(str) + '@zh.ch'),
+        'Abteilung': np.where(parent >= 0, np.array(ABTEILUNGEN, dtype=object)[abteilung], 'Direktion'),
+        'FK_PersonalNr': pd.Series(fk_nr, dtype='Int64').mask(fk_nr < 0)
+    })
+    df_stamm.to_csv(data_dir / "stammdaten.csv", index=False, encoding='utf-8-sig')
+    print(f"   ✓ {n_employees} Mitarbeitende in {len(sizes)} Ebenen (Führungsspanne ≈ {b:.1f})")
+
+    # 2. Gespräche: eines pro Person mit FK
+    has_fk = np.flatnonzero(fk_nr >= 0)
+    n = len(has_fk)
+    status = rng.choice(len(STATUS_WERTE), n, p=STATUS_ANTEILE)
+    erstellt = rng.integers(0, 60 * 86400, n)
+    geaendert = erstellt + rng.integers(0, 120 * 86400, n) * (status > 0)
+    df_gespraeche = pd.DataFrame({
+        'Gespraechs_ID': np.arange(1, n + 1),
+        'MA_PersonalNr': personal_nr[has_fk],
+        'FK_PersonalNr': fk_nr[has_fk],
+        'Datum': (pd.Timestamp('2025-02-01') + pd.to_timedelta(rng.integers(0, 240, n), unit='D')).strftime('%Y-%m-%d'),
+        'Status': np.array(STATUS_WERTE, dtype=object)[status]
+    })
+    # Geplante Gespräche sind noch leer, die übrigen haben Text in allen Feldern
+    for field in SAETZE:
+        texte = _text_pool(rng, field)[rng.integers(0, TEXT_VARIANTEN, n)]
+        df_gespraeche[field] = np.where(status > 0, texte, '')
+    df_gespraeche['PDF_Pfad'] = ''
+    df_gespraeche['Erstellt_am'] = _timestamps('2025-01-06 08:00:00', erstellt)
+    df_gespraeche['Geaendert_am'] = _timestamps('2025-01-06 08:00:00', geaendert)
+    df_gespraeche['Abgeschlossen_am'] = np.where(status == 2, df_gespraeche['Geaendert_am'], '')
+
+    df_gespraeche.to_csv(data_dir / "gespraeche.csv", index=False, encoding='utf-8-sig')
+    # Journal gehört zur alten gespraeche.csv
+    (data_dir / "gespraeche.journal").unlink(missing_ok=True)
+    print(f"   ✓ {n} Gespräche erstellt "
+          f"({', '.join(f'{s}: {c}' for s, c in zip(STATUS_WERTE, np.bincount(status, minlength=3)))})")
+
+    # 3. Tokens für alle FKs und HR (aus dem Seed abgeleitet, nur für Tests!)
+    managers = np.unique(fk_nr[has_fk])
+    zufall = rng.bytes(16 * (len(managers) + 1))
+    suffix = [base64.urlsafe_b64encode(zufall[i * 16:(i + 1) * 16]).decode().rstrip('=')
+              for i in range(len(managers) + 1)]
+    by_nr = df_stamm.set_index('PersonalNr').loc[managers]
+    now = datetime.now()
+    df_tokens = pd.DataFrame({
+        'Token': [f"FK{nr:05d}_{s}" for nr, s in zip(managers, suffix)] + [f"HR_MASTER_{suffix[-1]}"],
+        'PersonalNr': np.append(managers, HR_PERSONAL_NR),
+        'Name': list(by_nr['Vorname'] + ' ' + by_nr['Nachname']) + ['HR Team'],
+        'Email': list(by_nr['Email']) + ['hr@zh.ch'],
+        'Rolle': ['FK'] * len(managers) + ['HR'],
+        'Gueltig_bis': (now + timedelta(days=365)).strftime('%Y-%m-%d'),
+        'Erstellt_am': now.strftime('%Y-%m-%d %H:%M:%S')
+    }, columns=TOKEN_COLUMNS)
+    write_tokens(data_dir / "tokens.csv", df_tokens)
+    print(f"   ✓ {len(df_tokens)} Tokens erstellt ({len(managers)} FK + HR)")
+
+    print("\n" + "=" * 70)
+    print(f"✅ TESTDATEN ERSTELLT in {(datetime.now() - started).total_seconds():.1f}s (Seed {seed})")
+    print("=" * 70)
+    print()
+    print("⚠️  Die Tokens sind aus dem Seed berechenbar: nur für Tests verwenden!")
+    print(f"   HR-Token: {df_tokens['Token'].iloc[-1]}")
+    print()
+    print(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+
+
 if __name__ == "__main__":
-    create_initial_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="CSV-Dateien anlegen (Beispieldaten oder synthetische Testdaten)")
+    parser.add_argument('--employees', type=int,
+                        help="Synthetische Testdaten mit so vielen Mitarbeitenden erzeugen")
+    parser.add_argument('--depth', type=int, default=6, help="Anzahl Hierarchie-Ebenen (Standard 6)")
+    parser.add_argument('--seed', type=int, default=42, help="Zufalls-Seed (gleicher Seed = gleiche Daten)")
+    parser.add_argument('--force', action='store_true', help="Bestehende Daten überschreiben")
+    parser.add_argument('--replace-tokens', action='store_true',
+                        help="Bestehende tokens.csv durch Test-Tokens aus dem Seed ersetzen (nie produktiv!)")
+    args = parser.parse_args()
+
+    if args.employees:
+        generate_dataset(args.employees, args.depth, args.seed, args.force, replace_tokens=args.replace_tokens)
+    else:
+        create_initial_data()
\ No newline at end of file
@@ -0,0 +1,281 @@
+## 🗃️ **SQLite-Backend - sqlite_store.py**
+
+import json
+import sqlite3
+import secrets
+import threading
+from datetime import datetime
+from datastore import ConflictError, INTEGER_COLUMNS
+from token_index import hash_token
+from metrics import metrics
+
+# Tabelle -> (Primärschlüssel, indexierte Spalten)
+TABLES = {
+    'gespraeche': ('Gespraechs_ID', ['FK_PersonalNr', 'MA_PersonalNr']),
+    'stammdaten': ('PersonalNr', ['FK_PersonalNr']),
+    'tokens': ('Token_Hash', ['PersonalNr'])
+}
+
+
+def quote(name):
+    """SQL-Bezeichner quoten"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(path):
+    """Verbindung mit WAL-Modus öffnen (Transaktionen werden explizit gestartet)"""
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def create_table(conn, table, columns):
+    """Tabelle (neu) anlegen, inkl. Primärschlüssel und Indizes"""
+    key, indexed = TABLES[table]
+    definitions = []
+    for column in columns:
+        sql_type = 'INTEGER' if column in INTEGER_COLUMNS else 'TEXT'
+        if column == key:
+            sql_type += ' PRIMARY KEY'
+        definitions.append(f"{quote(column)} {sql_type}")
+
+    conn.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+    conn.execute(f"CREATE TABLE {quote(table)} ({', '.join(definitions)})")
+    for column in indexed:
+        if column in columns:
+            conn.execute(
+                f"CREATE INDEX {quote(f'idx_{table}_{column}')} "
+                f"ON {quote(table)} ({quote(column)})"
+            )
+
+
+def insert_rows(conn, table, columns, rows):
+    """Zeilen (Dicts wie aus dem CSV-Backend) einfügen, leere Ganzzahl-Felder als NULL"""
+    integer = [column in INTEGER_COLUMNS for column in columns]
+    placeholders = ', '.join('?' for _ in columns)
+    conn.executemany(
+        f"INSERT INTO {quote(table)} ({', '.join(map(quote, columns))}) VALUES ({placeholders})",
+        (
+            [None if is_int and row.get(column, '') == '' else row.get(column, '')
+             for column, is_int in zip(columns, integer)]
+            for row in rows
+        )
+    )
+
+
+def ensure_meta(conn):
+    """Tabelle meta mit Datenstand anlegen, falls sie fehlt"""
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        "INSERT OR IGNORE INTO meta VALUES ('epoch', ?), ('version', '0')",
+        (secrets.token_hex(4),)
+    )
+
+
+def bump_version(conn, new_epoch=False):
+    """Datenstand erhöhen (innerhalb der schreibenden Transaktion aufrufen)"""
+    ensure_meta(conn)
+    conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+    if new_epoch:
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'epoch'", (secrets.token_hex(4),))
+
+
+def _row_to_dict(row):
+    # NULL zu leeren Strings (wie im CSV-Backend)
+    return {k: ('' if row[k] is None else row[k]) for k in row.keys()}
+
+
+class SqliteStore:
+    """Gespräche und Stammdaten aus SQLite, gleiche Schnittstelle wie DataStore"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._columns = {}
+
+    @property
+    def conn(self):
+        # Eine Verbindung pro Thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.path)
+            ensure_meta(conn)
+            self._local.conn = conn
+        return conn
+
+    def _table_columns(self, table, refresh=False):
+        # Pro Prozess gecacht; andere Prozesse können inzwischen Spalten ergänzt haben
+        if refresh or table not in self._columns:
+            rows = self.conn.execute(f"PRAGMA table_info({quote(table)})").fetchall()
+            self._columns[table] = [row['name'] for row in rows]
+        return self._columns[table]
+
+    @property
+    def version(self):
+        """Datenstand (wird bei jedem Schreibzugriff erhöht)"""
+        rows = self.conn.execute("SELECT key, value FROM meta").fetchall()
+        meta = {row['key']: row['value'] for row in rows}
+        return f"{meta.get('epoch', '')}-{meta.get('version', '0')}"
+
+    def changes_since(self, token):
+        """Wie DataStore.changes_since, ohne Änderungsliste: bei neuem Stand alles neu"""
+        version = self.version
+        return version, (set() if version == token else None)
+
+    def list_gespraeche(self, fk_personal_nr=None):
+        """Alle Gespräche, optional nur die einer Führungskraft (oder einer Menge von FKs)"""
+        if fk_personal_nr is None:
+            rows = self.conn.execute(
+                "SELECT * FROM gespraeche ORDER BY Gespraechs_ID"
+            )
+        elif isinstance(fk_personal_nr, (set, frozenset)):
+            rows = self.conn.execute(
+                "SELECT * FROM gespraeche WHERE FK_PersonalNr IN "
+                "(SELECT value FROM json_each(?)) ORDER BY Gespraechs_ID",
+                (json.dumps(sorted(fk_personal_nr)),)
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT * FROM gespraeche WHERE FK_PersonalNr = ? ORDER BY Gespraechs_ID",
+                (fk_personal_nr,)
+            )
+        return [_row_to_dict(row) for row in rows]
+
+    def get_gespraech(self, gespraechs_id):
+        row = self.conn.execute(
+            "SELECT * FROM gespraeche WHERE Gespraechs_ID = ?", (int(gespraechs_id),)
+        ).fetchone()
+        return _row_to_dict(row) if row is not None else None
+
+    @property
+    def stammdaten_version(self):
+        """Stammdaten ändern sich nur beim Import (neue Epoche)"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()
+        return row['value'] if row is not None else ''
+
+    def list_mitarbeiter(self):
+        rows = self.conn.execute("SELECT * FROM stammdaten ORDER BY PersonalNr")
+        return [_row_to_dict(row) for row in rows]
+
+    def get_mitarbeiter(self, personal_nr):
+        if personal_nr == '':
+            return None
+        row = self.conn.execute(
+            "SELECT * FROM stammdaten WHERE PersonalNr = ?", (int(personal_nr),)
+        ).fetchone()
+        return _row_to_dict(row) if row is not None else None
+
+    def update_gespraech(self, gespraechs_id, fields, expected=None):
+        """Felder einer Zeile ändern (nur diese Zeile wird geschrieben).
+
+        expected: optionale Vorbedingung {Spalte: Wert}, sonst ConflictError
+        """
+        status, row = self.update_gespraeche([(gespraechs_id, fields, expected)])[0]
+        if status == 'conflict':
+            raise ConflictError(row)
+        return row
+
+    def update_gespraeche(self, updates):
+        """Mehrere Gespräche [(id, fields, expected)] in einer Transaktion ändern.
+
+        Gibt pro Änderung (status, Zeile) zurück wie DataStore.update_gespraeche.
+        """
+        columns = self._table_columns('gespraeche')
+        results = []
+        with metrics.span('sqlite_write'), self.conn:
+            # Schreib-Lock sofort holen, damit Prüfung und Update atomar sind
+            self.conn.execute('BEGIN IMMEDIATE')
+            for gespraechs_id, fields, expected in updates:
+                current = self.get_gespraech(gespraechs_id)
+                if current is None:
+                    results.append(('not_found', None))
+                    continue
+                if any(str(current.get(column, '')) != str(value)
+                       for column, value in (expected or {}).items()):
+                    results.append(('conflict', current))
+                    continue
+                for column in fields:
+                    if column not in columns:
+                        # Unter dem Schreib-Lock neu lesen: ein anderer Worker hat die Spalte evtl. schon angelegt
+                        columns = self._table_columns('gespraeche', refresh=True)
+                    if column not in columns:
+                        self.conn.execute(
+                            f"ALTER TABLE gespraeche ADD COLUMN {quote(column)} TEXT"
+                        )
+                        columns.append(column)
+                assignments = ', '.join(f"{quote(column)} = ?" for column in fields)
+                self.conn.execute(
+                    f"UPDATE gespraeche SET {assignments} WHERE Gespraechs_ID = ?",
+                    (*fields.values(), int(gespraechs_id))
+                )
+                results.append(('ok', int(gespraechs_id)))
+            if any(status == 'ok' for status, _ in results):
+                bump_version(self.conn)
+        return [(status, self.get_gespraech(value) if status == 'ok' else value)
+                for status, value in results]
+
+    def archive_gespraeche(self, handle):
+        """Alle Gespräche an handle(rows, columns) übergeben und danach entfernen"""
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            handle(self.list_gespraeche(), list(self._table_columns('gespraeche', refresh=True)))
+            self.conn.execute("DELETE FROM gespraeche")
+            bump_version(self.conn)
+
+    def replace_stammdaten(self, build):
+        """Stammdaten mit build(rows, columns) -> (rows, columns) oder None ersetzen.
+
+        Eine Transaktion; die neue Epoche baut Mitarbeitenden-Index und Zähler neu auf.
+        """
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            result = build(self.list_mitarbeiter(), list(self._table_columns('stammdaten', refresh=True)))
+            if result is None:
+                return
+            rows, columns = result
+            create_table(self.conn, 'stammdaten', columns)
+            insert_rows(self.conn, 'stammdaten', columns, rows)
+            bump_version(self.conn, new_epoch=True)
+        self._columns.pop('stammdaten', None)
+
+
+class SqliteTokenIndex:
+    """Token-Prüfung gegen die Tabelle tokens (Schlüssel: Token-Hash).
+
+    Ein Lookup ist eine Primärschlüssel-Abfrage; ein Negativ-Cache ist
+    hier nicht nötig.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, token):
+        """User-Daten zu einem gültigen Token oder None"""
+        if not token:
+            return None
+        row = self.conn.execute(
+            "SELECT PersonalNr, Rolle, Name, Email, Gueltig_bis FROM tokens "
+            "WHERE Token_Hash = ?",
+            (hash_token(token),)
+        ).fetchone()
+        if row is None:
+            return None
+        if datetime.fromisoformat(row['Gueltig_bis']) < datetime.now():
+            return None
+        return {
+            'personal_nr': int(row['PersonalNr']),
+            'rolle': row['Rolle'],
+            'name': row['Name'],
+            'email': row['Email'] or ''
+        }
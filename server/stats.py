@@ -0,0 +1,131 @@
+## 📊 **Statistiken - stats.py**
+
+import threading
+from collections import Counter
+
+# Status -> Schlüssel in der API
+STATUS_KEYS = {
+    'Geplant': 'geplant',
+    'In Bearbeitung': 'in_bearbeitung',
+    'Abgeschlossen': 'abgeschlossen'
+}
+
+# Mögliche Werte für ?group_by= (Monat = Abschlussmonat, leer wenn offen)
+GROUP_FIELDS = ['Abteilung', 'FK_PersonalNr', 'Monat']
+
+
+def completion_month(gespraech):
+    """Abschlussmonat (JJJJ-MM) oder '' für offene Gespräche"""
+    if gespraech.get('Status') != 'Abgeschlossen':
+        return ''
+    # Ältere Datensätze ohne Abgeschlossen_am: letzte Änderung
+    date = gespraech.get('Abgeschlossen_am') or gespraech.get('Geaendert_am') or ''
+    return str(date)[:7]
+
+
+def parse_group_by(value):
+    """group_by=Abteilung,Monat -> ['Abteilung', 'Monat'], ValueError bei Unbekanntem"""
+    fields = [f.strip() for f in (value or '').split(',') if f.strip()]
+    for field in fields:
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Gruppierung nach '{field}' nicht möglich "
+                             f"(erlaubt: {', '.join(GROUP_FIELDS)})")
+    return fields
+
+
+def _empty_counts():
+    return {'total': 0, **{key: 0 for key in STATUS_KEYS.values()}}
+
+
+class StatsIndex:
+    """Zähler nach Status × Abteilung × FK × Abschlussmonat.
+
+    Wird bei jeder Abfrage mit den seit dem letzten Mal geänderten
+    Gesprächen nachgeführt (store.changes_since), statt alle Gespräche
+    neu zu zählen. Abfragen laufen nur über die vorhandenen Kombinationen.
+    """
+
+    def __init__(self, store, employees):
+        self.store = store
+        self.employees = employees
+        self._token = None
+        self._counts = Counter()
+        self._row_keys = {}
+        self._lock = threading.Lock()
+
+    def _key(self, gespraech, by_nr):
+        ma = by_nr.get(gespraech['MA_PersonalNr'])
+        return (
+            gespraech['Status'],
+            ma.abteilung if ma is not None else '',
+            gespraech['FK_PersonalNr'],
+            completion_month(gespraech)
+        )
+
+    def _add(self, gespraech, by_nr):
+        gespraechs_id = int(gespraech['Gespraechs_ID'])
+        key = self._key(gespraech, by_nr)
+        self._row_keys[gespraechs_id] = key
+        self._counts[key] += 1
+
+    def _remove(self, gespraechs_id):
+        key = self._row_keys.pop(gespraechs_id, None)
+        if key is not None:
+            self._counts[key] -= 1
+            if not self._counts[key]:
+                del self._counts[key]
+
+    def refresh(self):
+        """Zähler auf den aktuellen Datenstand bringen"""
+        with self._lock:
+            token, changed = self.store.changes_since(self._token)
+            by_nr = self.employees.current()
+            if changed is None:
+                self._counts.clear()
+                self._row_keys.clear()
+                for gespraech in self.store.list_gespraeche():
+                    self._add(gespraech, by_nr)
+            else:
+                for gespraechs_id in changed:
+                    self._remove(gespraechs_id)
+                    gespraech = self.store.get_gespraech(gespraechs_id)
+                    if gespraech is not None:
+                        self._add(gespraech, by_nr)
+            self._token = token
+
+    def summary(self, fk_personal_nr=None, group_by=()):
+        """Zähler gesamt und optional pro Gruppe.
+
+        fk_personal_nr: nur Gespräche dieser Führungskraft (oder Menge von FKs)
+        group_by: Felder aus GROUP_FIELDS
+        """
+        if fk_personal_nr is not None and not isinstance(fk_personal_nr, (set, frozenset)):
+            fk_personal_nr = {fk_personal_nr}
+        self.refresh()
+        with self._lock:
+            counts = list(self._counts.items())
+
+        totals = _empty_counts()
+        groups = {}
+        for (status, abteilung, fk, monat), count in counts:
+            if fk_personal_nr is not None and fk not in fk_personal_nr:
+                continue
+            targets = [totals]
+            if group_by:
+                values = {'Abteilung': abteilung, 'FK_PersonalNr': fk, 'Monat': monat}
+                group = tuple(values[field] for field in group_by)
+                if group not in groups:
+                    groups[group] = _empty_counts()
+                targets.append(groups[group])
+            for target in targets:
+                target['total'] += count
+                if status in STATUS_KEYS:
+                    target[STATUS_KEYS[status]] += count
+
+        result = dict(totals)
+        if group_by:
+            result['groups'] = [
+                {**dict(zip(group_by, group)), **groups[group]}
+                for group in sorted(groups, key=lambda g: tuple(str(v) for v in g))
+            ]
+        return result
@@ -0,0 +1,43 @@
+## 🌊 **Streaming-Antworten - streaming.py**
+
+import json
+
+# Zeilen pro geschriebenem Block
+CHUNK_ROWS = 200
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _chunked(parts):
+    # Kleine Teile zu Blöcken zusammenfassen (weniger Overhead pro Write)
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= CHUNK_ROWS:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_json(rows, key, meta):
+    """Objekt {**meta, key: [rows...]} Zeile für Zeile als JSON erzeugen"""
+    def parts():
+        head = _dumps(meta)
+        # Metadaten zuerst, Liste als letztes Feld
+        yield head[:-1] + (',' if meta else '') + _dumps(key) + ':['
+        first = True
+        for row in rows:
+            yield ('' if first else ',') + _dumps(row)
+            first = False
+        yield ']}'
+    return _chunked(parts())
+
+
+def stream_ndjson(rows):
+    """Eine JSON-Zeile pro Datensatz"""
+    return _chunked(_dumps(row) + '\n' for row in rows)
@@ -0,0 +1,95 @@
+## 🔄 **Delta-Sync und Server-Sent Events - sync.py**
+
+import json
+import time
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Änderungen werden vor dem Speichern gestempelt: etwas Überlappung,
+# damit langsame Schreibzugriffe beim nächsten Sync nicht fehlen
+SYNC_OVERLAP_SECONDS = 5
+
+# Event-Streams nach dieser Zeit beenden (Browser verbindet neu), Ping-Intervall
+EVENT_STREAM_SECONDS = 300
+EVENT_HEARTBEAT_SECONDS = 15
+
+
+def parse_since(value):
+    """since=2025-03-01 12:00:00 (oder ISO mit T) -> normierter Zeitstempel"""
+    try:
+        return datetime.fromisoformat(value.strip()).strftime(TIMESTAMP_FORMAT)
+    except ValueError:
+        raise ValueError('Parameter since muss ein Zeitstempel sein (z.B. 2025-03-01 12:00:00)')
+
+
+def sync_token():
+    """Zeitstempel für den nächsten Aufruf mit since="""
+    return (datetime.now() - timedelta(seconds=SYNC_OVERLAP_SECONDS)).strftime(TIMESTAMP_FORMAT)
+
+
+def split_changes(rows, keys, since, query):
+    """Seit since geänderte Gespräche aufteilen in (passende Zeilen, entfernte IDs).
+
+    rows/keys: Liste nach Geaendert_am sortiert (wie von build_listing).
+    Geänderte Gespräche, die nicht mehr zum Filter passen, gelten als
+    entfernt und sollen aus der Ansicht verschwinden.
+    """
+    changed, removed = [], []
+    for row in rows[bisect_left(keys, (since,)):]:
+        if query.matches(row):
+            changed.append(row)
+        else:
+            removed.append(row['Gespraechs_ID'])
+    return changed, removed
+
+
+def format_event(event, data):
+    """Ein Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ChangeNotifier:
+    """Meldet geänderte Datenstände an wartende Event-Streams.
+
+    Ein Hintergrund-Thread pro Prozess fragt get_version() regelmässig ab,
+    die Streams warten nur auf die Benachrichtigung. Da der Datenstand
+    in allen Worker-Prozessen gleich berechnet wird, kommen auch
+    Änderungen aus anderen Prozessen an.
+    """
+
+    def __init__(self, get_version, interval=1.0):
+        self.get_version = get_version
+        self.interval = interval
+        self._version = None
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def _run(self):
+        while True:
+            try:
+                version = self.get_version()
+                with self._condition:
+                    if version != self._version:
+                        self._version = version
+                        self._condition.notify_all()
+            except Exception as e:
+                print(f"❌ Änderungsprüfung fehlgeschlagen: {e}")
+            time.sleep(self.interval)
+
+    def _start(self):
+        # Erst beim ersten Stream starten (nach dem Fork der Web-Worker)
+        with self._condition:
+            if self._thread is None:
+                self._version = self.get_version()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def wait(self, version, timeout):
+        """Warten, bis sich der Datenstand von version unterscheidet; gibt den Stand zurück"""
+        self._start()
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._version
@@ -0,0 +1,99 @@
+## 📐 **Textumbruch für PDFs - text_layout.py**
+
+from functools import lru_cache
+
+
+class _GlyphWidths(dict):
+    """Zeichenbreiten bei Schriftgrösse 1000, wird beim ersten Zugriff gefüllt"""
+
+    def __init__(self, font_name):
+        super().__init__()
+        # ReportLab erst laden, wenn wirklich gemessen wird
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        self.font_name = font_name
+        self._string_width = stringWidth
+
+    def __missing__(self, char):
+        width = self._string_width(char, self.font_name, 1000)
+        self[char] = width
+        return width
+
+
+class FontMetrics:
+    """Breiten einer Schrift, jedes Zeichen wird nur einmal gemessen"""
+
+    def __init__(self, font_name):
+        self.font_name = font_name
+        self._glyphs = _GlyphWidths(font_name)
+
+    def width(self, text, size):
+        glyphs = self._glyphs
+        return sum(glyphs[char] for char in text) * size / 1000
+
+
+@lru_cache(maxsize=None)
+def metrics(font_name):
+    """Gemeinsame FontMetrics pro Schrift"""
+    return FontMetrics(font_name)
+
+
+def _split_word(word, font, size, max_width):
+    # Wort breiter als die Zeile: zeichenweise umbrechen
+    parts, start, width = [], 0, 0
+    for i, char in enumerate(word):
+        w = font.width(char, size)
+        if width + w > max_width and i > start:
+            parts.append((word[start:i], width))
+            start, width = i, 0
+        width += w
+    parts.append((word[start:], width))
+    return parts
+
+
+def wrap_lines(text, font_name, size, max_width):
+    """Text in Zeilen aufteilen, die höchstens max_width breit sind.
+
+    Jedes Wort wird einmal gemessen, die Zeilenbreite wird laufend
+    aufsummiert. Leere Zeilen im Text bleiben als Absatz erhalten.
+    """
+    font = metrics(font_name)
+    space = font.width(' ', size)
+
+    for paragraph in str(text).split('\n'):
+        words = paragraph.split()
+        if not words:
+            yield ''
+            continue
+
+        line, line_width = [], 0
+        for word in words:
+            word_width = font.width(word, size)
+            pieces = ([(word, word_width)] if word_width <= max_width
+                      else _split_word(word, font, size, max_width))
+            for piece, piece_width in pieces:
+                needed = piece_width + (space if line else 0)
+                if line and line_width + needed > max_width:
+                    yield ' '.join(line)
+                    line, line_width = [], 0
+                    needed = piece_width
+                line.append(piece)
+                line_width += needed
+        yield ' '.join(line)
+
+
+def draw_lines(c, lines, x, y, font_name, size, leading, bottom, top):
+    """Zeilen ab y untereinander zeichnen, bei Bedarf auf neuen Seiten.
+
+    Gibt die y-Position unter der letzten Zeile zurück.
+    """
+    text = c.beginText(x, y)
+    text.setFont(font_name, size, leading)
+    for line in lines:
+        if text.getY() < bottom:
+            c.drawText(text)
+            c.showPage()
+            text = c.beginText(x, top)
+            text.setFont(font_name, size, leading)
+        text.textLine(line)
+    c.drawText(text)
+    return text.getY()
@@ -0,0 +1,95 @@
+## 🔑 **Token-Index - token_index.py**
+
+import os
+import csv
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+def hash_token(token):
+    """SHA-256 des Tokens (Klartext-Tokens werden nicht als Schlüssel gehalten)"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def parse_date(value):
+    """'2026-12-31' oder '2026-12-31 23:59:59' -> datetime, sonst None"""
+    try:
+        return datetime.fromisoformat((value or '').strip())
+    except ValueError:
+        return None
+
+
+class TokenIndex:
+    """tokens.csv als Dict nach Token-Hash, mit bereits geparster Gültigkeit.
+
+    Die Datei wird nur neu gelesen, wenn sich Änderungszeit oder Grösse
+    geändert haben. Unbekannte Tokens landen in einem begrenzten
+    Negativ-Cache, der bei jedem Neuladen verworfen wird.
+    """
+
+    def __init__(self, path, negative_cache_size=4096):
+        self.path = path
+        self.negative_cache_size = negative_cache_size
+        self._entries = {}
+        self._negative = OrderedDict()
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        entries = {}
+        with open(self.path, encoding='utf-8-sig', newline='') as f:
+            for record in csv.DictReader(f):
+                # Zeilen ohne Token oder gültiges Ablaufdatum ignorieren
+                gueltig_bis = parse_date(record.get('Gueltig_bis'))
+                if not record.get('Token') or gueltig_bis is None:
+                    continue
+                entries[hash_token(record['Token'])] = (
+                    gueltig_bis,
+                    {
+                        'personal_nr': int(float(record['PersonalNr'])),
+                        'rolle': record['Rolle'],
+                        'name': record['Name'],
+                        'email': record.get('Email') or ''
+                    }
+                )
+        self._entries = entries
+        self._negative.clear()
+
+    def refresh(self):
+        """Neu laden, falls sich tokens.csv geändert hat"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature != self._signature:
+                self._load()
+                self._signature = signature
+
+    def lookup(self, token):
+        """User-Daten zu einem gültigen Token oder None"""
+        if not token:
+            return None
+        self.refresh()
+
+        key = hash_token(token)
+        if key in self._negative:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                self._negative[key] = True
+                if len(self._negative) > self.negative_cache_size:
+                    self._negative.popitem(last=False)
+            return None
+
+        valid_until, user = entry
+        if valid_until < datetime.now():
+            return None
+        return dict(user)